@@ -4,18 +4,53 @@ Loads environment variables and provides default values
 """
 
 import os
-from dotenv import load_dotenv
+import importlib.util
+from functools import lru_cache
+from typing import Optional
 from pathlib import Path
 
-# Load environment variables from .env file
 env_path = Path(__file__).parent / '.env'
-load_dotenv(env_path)
+env_cache_path = Path(__file__).parent / '_env_cache.py'
+
+def _load_env_fast():
+    """Load .env via a generated Python module so warm starts skip dotenv parsing"""
+    try:
+        env_mtime = env_path.stat().st_mtime
+    except FileNotFoundError:
+        return
+    
+    try:
+        cache_is_fresh = env_cache_path.stat().st_mtime >= env_mtime
+    except FileNotFoundError:
+        cache_is_fresh = False
+    
+    if not cache_is_fresh:
+        # Regenerate the cache from .env; dotenv is only imported here
+        from dotenv import dotenv_values, load_dotenv
+        values = dotenv_values(env_path)
+        lines = ["# Generated from .env by config.py - do not edit\n", "import os\n"]
+        lines += [f"os.environ.setdefault({key!r}, {value!r})\n"
+                  for key, value in values.items() if value is not None]
+        try:
+            env_cache_path.write_text("".join(lines), encoding='utf-8')
+        except OSError:
+            pass
+        load_dotenv(env_path)
+        return
+    
+    # Executing the cached module reuses its compiled .pyc on subsequent starts
+    spec = importlib.util.spec_from_file_location('_env_cache', env_cache_path)
+    spec.loader.exec_module(importlib.util.module_from_spec(spec))
+
+# Load environment variables from .env file (exported variables take precedence)
+_load_env_fast()
 
 class Config:
     """Configuration class for RAG Bot"""
     
     # Hugging Face Configuration
     HF_TOKEN = os.getenv('HF_TOKEN')
+    _hf_token_cache: Optional[str] = None
     
     # Server Configuration
     SERVER_HOST = os.getenv('SERVER_HOST', '0.0.0.0')
@@ -29,9 +64,21 @@ class Config:
     DATA_PATH = os.path.join(os.path.dirname(__file__), 'data')
     INDEX_PATH = os.path.join(os.path.dirname(__file__), 'simple_rag_index')
     
-    # Model Configuration
-    DEFAULT_EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
-    DEFAULT_GENERATION_MODEL = "microsoft/DialoGPT-medium"
+    # Vector Index Configuration
+    VECTOR_INDEX_TYPE = os.getenv('VECTOR_INDEX_TYPE', 'flat')  # flat, hnsw or ivfpq
+    VECTOR_QUANTIZATION = os.getenv('VECTOR_QUANTIZATION') or None  # unset (float32), fp16 or int8
+    VECTOR_EF_SEARCH = int(os.getenv('VECTOR_EF_SEARCH', 64))  # HNSW search breadth
+    VECTOR_USE_GPU = os.getenv('VECTOR_USE_GPU', 'False').lower() == 'true'  # Needs faiss-gpu
+    
+    # Embedding Encoder Configuration
+    EMBEDDING_PRECISION = os.getenv('EMBEDDING_PRECISION', 'fp32')  # fp32, fp16 (CUDA) or int8 (CPU)
+    EMBEDDING_USE_ONNX = os.getenv('EMBEDDING_USE_ONNX', 'False').lower() == 'true'  # Needs optimum[onnxruntime]
+    
+    # Model Configuration (resolved on demand via get_model)
+    _MODEL_DEFAULTS = {
+        'embedding': ('EMBEDDING_MODEL', "all-MiniLM-L6-v2"),  # Same name existing indexes were saved with
+        'gen': ('GENERATION_MODEL', "microsoft/DialoGPT-medium"),
+    }
     
     @classmethod
     def validate(cls):
@@ -48,11 +95,23 @@ class Config:
                 "Get your token from: https://huggingface.co/settings/tokens"
             )
     
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_model(cls, kind: str) -> str:
+        """Get the model name for 'embedding' or 'gen' on first use"""
+        try:
+            env_var, default = cls._MODEL_DEFAULTS[kind]
+        except KeyError:
+            raise ValueError(f"Unknown model kind: {kind}. Expected one of: {', '.join(cls._MODEL_DEFAULTS)}")
+        return os.getenv(env_var, default)
+    
     @classmethod
     def get_YOUR_HF_TOKEN_HERE(cls):
-        """Get HF token with validation"""
-        cls.validate()
-        return cls.HF_TOKEN
+        """Get HF token with validation (validated once, then cached)"""
+        if cls._hf_token_cache is None:
+            cls.validate()
+            cls._hf_token_cache = cls.HF_TOKEN
+        return cls._hf_token_cache
 
 # Validate configuration on import
 try:
@@ -6,6 +6,7 @@ This demonstrates all the RAG functionality with the working HF token
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from config import Config
 
@@ -28,27 +29,49 @@ def run_demo():
     # Initialize components
     print("\n🔧 Initializing RAG components...")
     doc_processor = DocumentProcessor()
-    vector_store = VectorStore(index_path="demo_rag_index")
+    vector_store = VectorStore(index_path="demo_rag_index",
+                               quantization=Config.VECTOR_QUANTIZATION,
+                               index_type=Config.VECTOR_INDEX_TYPE,
+                               ef_search=Config.VECTOR_EF_SEARCH,
+                               use_gpu_index=Config.VECTOR_USE_GPU,
+                               precision=Config.EMBEDDING_PRECISION,
+                               use_onnx=Config.EMBEDDING_USE_ONNX)
     rag_pipeline = RAGPipeline(HF_TOKEN)
     print("✅ Components initialized!")
     
-    # Load documents from data directory
+    # Load documents from data directory (one directory scan, cached DirEntry stats)
     data_dir = Path("data")
-    if data_dir.exists():
-        print(f"\n📁 Loading documents from '{data_dir}'...")
-        loaded_count = 0
-        total_chunks = 0
+    try:
+        with os.scandir(data_dir) as it:
+            entries = [entry for entry in it if entry.is_file() and entry.name.endswith('.txt')]
+    except FileNotFoundError:
+        print("⚠ No data directory found")
+        return
+    
+    print(f"\n📁 Loading documents from '{data_dir}'...")
+    loaded_count = 0
+    total_chunks = 0
+    
+    def process_file(entry):
+        # Extract and split text (runs in a worker thread)
+        text = doc_processor.extract_text(entry.path)
+        return doc_processor.split_text(text, chunk_size=800, chunk_overlap=150)
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(8, len(entries)))) as executor:
+        futures = {executor.submit(process_file, entry): entry for entry in entries}
         
-        for file_path in data_dir.glob("*.txt"):
+        # Vector store updates stay on the main thread
+        for future in as_completed(futures):
+            entry = futures[future]
             try:
-                print(f"  📄 Processing: {file_path.name}")
-                
-                # Extract and split text
-                text = doc_processor.extract_text(str(file_path))
-                chunks = doc_processor.split_text(text, chunk_size=800, chunk_overlap=150)
+                print(f"  📄 Processing: {entry.name}")
+                chunks = future.result()
                 
-                # Add to vector store
-                metadata = [{"source": str(file_path), "chunk_id": i} for i in range(len(chunks))]
+                # Add to vector store (source strings are shared by every chunk of the file)
+                source = sys.intern(entry.path)
+                source_name = sys.intern(entry.name)
+                metadata = [{"source": source, "source_name": source_name, "chunk_id": i}
+                            for i in range(len(chunks))]
                 vector_store.add_documents(chunks, metadata)
                 
                 loaded_count += 1
@@ -56,12 +79,12 @@ def run_demo():
                 print(f"    ✅ Added {len(chunks)} chunks")
                 
             except Exception as e:
-                print(f"    ❌ Error processing {file_path.name}: {e}")
-        
-        print(f"\n📊 Summary: {loaded_count} documents loaded, {total_chunks} total chunks")
-    else:
-        print("⚠ No data directory found")
-        return
+                print(f"    ❌ Error processing {entry.name}: {e}")
+    
+    # Persist everything loaded above in one write
+    vector_store.flush()
+    
+    print(f"\n📊 Summary: {loaded_count} documents loaded, {total_chunks} total chunks")
     
     # Get system stats
     print("\n📈 System Statistics:")
@@ -85,31 +108,33 @@ def run_demo():
     print("-" * 40)
     
     for i, question in enumerate(demo_questions, 1):
-        print(f"\n{i}. ❓ Question: {question}")
+        # Collect this question's output and write it in one call
+        lines = [f"\n{i}. ❓ Question: {question}"]
         
         # Search for relevant documents
         relevant_docs = vector_store.search(question, top_k=3)
         
         if relevant_docs:
-            print(f"   🔍 Found {len(relevant_docs)} relevant document(s)")
+            lines.append(f"   🔍 Found {len(relevant_docs)} relevant document(s)")
+            
+            # Source names in rank order, computed once; the first is the top chunk's
+            sources = list(dict.fromkeys(doc.metadata.get("source_name", "Unknown") for doc, _ in relevant_docs))
             
             # Show top relevant chunk
-            top_doc, top_score = relevant_docs[0]
-            source_name = Path(top_doc.metadata.get("source", "Unknown")).name
-            print(f"   📄 Top source: {source_name} (similarity: {top_score:.3f})")
+            top_score = relevant_docs[0][1]
+            lines.append(f"   📄 Top source: {sources[0]} (similarity: {top_score:.3f})")
             
             # Generate answer
             answer = rag_pipeline.generate_answer(question, relevant_docs, max_tokens=200)
-            print(f"   🤖 Answer: {answer}")
+            lines.append(f"   🤖 Answer: {answer}")
             
             # Show sources
-            sources = list(set([Path(doc.metadata.get("source", "Unknown")).name 
-                              for doc, _ in relevant_docs]))
-            print(f"   📚 Sources: {', '.join(sources)}")
+            lines.append(f"   📚 Sources: {', '.join(sources)}")
         else:
-            print("   ❌ No relevant documents found")
+            lines.append("   ❌ No relevant documents found")
         
-        print()
+        lines.append("")
+        sys.stdout.write("\n".join(lines) + "\n")
     
     # Search demo
     print("\n🔍 Search Demo:")
@@ -126,7 +151,7 @@ def run_demo():
         results = vector_store.search(query, top_k=2)
         
         for j, (doc, score) in enumerate(results, 1):
-            source = Path(doc.metadata.get("source", "Unknown")).name
+            source = doc.metadata.get("source_name", "Unknown")
             preview = doc.page_content[:100].replace('\n', ' ')
             print(f"  {j}. [{source}] Score: {score:.3f}")
             print(f"     Preview: {preview}...")
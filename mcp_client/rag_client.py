@@ -1,12 +1,10 @@
 import asyncio
-import json
 import logging
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, TYPE_CHECKING
 
-# MCP client imports
-from mcp import ClientSession
-from mcp.client.stdio import stdio_client
+if TYPE_CHECKING:
+    from mcp import ClientSession
 
 logger = logging.getLogger(__name__)
 
@@ -15,10 +13,13 @@ class RAGClient:
     
     def __init__(self, server_script_path: str):
         self.server_script_path = server_script_path
-        self.session: ClientSession = None
+        self.session: "ClientSession" = None
         
     async def connect(self):
         """Connect to the RAG server"""
+        # MCP client imports are deferred until a connection is attempted
+        from mcp.client.stdio import stdio_client
+        
         try:
             # Start the server process
             server_params = {
@@ -1,8 +1,6 @@
-from transformers import pipeline
-import torch
-
 def test_local_models():
     """Test local models that don't require API tokens"""
+    from transformers import pipeline
     
     print("🚀 Testing local transformers models...\n")
     
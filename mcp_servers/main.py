@@ -1,8 +1,7 @@
-from huggingface_hub import InferenceClient
-import requests
 import sys
-import os
 from pathlib import Path
+
+# config lives in the project root, which isn't on sys.path for `python mcp_servers/main.py`
 sys.path.append(str(Path(__file__).parent.parent))
 from config import Config
 
@@ -10,6 +9,8 @@ HF_TOKEN = Config.get_hf_token()
 
 def test_token():
     """Test if the HF token is valid"""
+    import requests
+
     headers = {"Authorization": f"Bearer {HF_TOKEN}"}
     response = requests.get("https://huggingface.co/api/whoami", headers=headers)
     if response.status_code == 200:
@@ -22,6 +23,8 @@ def test_token():
 
 def try_simple_models():
     """Try simple, commonly available models"""
+    from huggingface_hub import InferenceClient
+
     models_to_try = [
         "distilbert-base-uncased-finetuned-sst-2-english",  # Sentiment analysis
         "facebook/bart-large-mnli",  # Text classification
@@ -1,28 +1,45 @@
 import os
+import re
 from typing import List, Optional
 from pathlib import Path
 import logging
 
-import PyPDF2
-from docx import Document
-
 logger = logging.getLogger(__name__)
 
+# Word tokens for split_text, compiled once per process
+_WS_RE = re.compile(r'\S+')
+
+# Every character \s (str.isspace) matches; none lies above U+3000
+_WHITESPACE = tuple(code for code in range(0x3001) if chr(code).isspace())
+
+# Above this many characters (roughly 10k words), split_text finds words and chunk windows with NumPy
+NUMPY_SPLIT_THRESHOLD = 60_000
+
 class DocumentProcessor:
     """Process different document types and extract text"""
     
-    def __init__(self):
-        self.supported_extensions = {'.txt', '.pdf', '.docx'}
+    # Immutable and shared by every processor; lookups stay O(1) set membership
+    supported_extensions = frozenset({'.txt', '.pdf', '.docx'})
     
     def extract_text(self, file_path: str) -> str:
         """Extract text from various document formats"""
         file_path = Path(file_path)
         
-        if not file_path.exists():
+        # A single stat both verifies existence and gives the size
+        try:
+            stat_result = os.stat(file_path)
+        except FileNotFoundError:
             raise FileNotFoundError(f"File not found: {file_path}")
         
         extension = file_path.suffix.lower()
         
+        if extension not in self.supported_extensions:
+            raise ValueError(f"Unsupported file type: {extension}")
+        
+        # Empty files never reach the format-specific parsers
+        if stat_result.st_size == 0:
+            return ""
+        
         if extension == '.txt':
             return self._extract_from_txt(file_path)
         elif extension == '.pdf':
@@ -34,35 +51,39 @@ class DocumentProcessor:
     
     def _extract_from_txt(self, file_path: Path) -> str:
         """Extract text from .txt file"""
+        # Read once as bytes and decode in a single call (no text-mode decoder layer)
+        data = file_path.read_bytes()
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
+            return data.decode('utf-8')
         except UnicodeDecodeError:
             # Fallback to latin-1 encoding
-            with open(file_path, 'r', encoding='latin-1') as file:
-                return file.read()
+            return data.decode('latin-1')
     
     def _extract_from_pdf(self, file_path: Path) -> str:
         """Extract text from .pdf file"""
+        # Imported lazily so TXT-only workloads never load PyPDF2
+        import PyPDF2
+
         try:
-            text = ""
             with open(file_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-            return text
+                pages = pdf_reader.pages
+                parts = [None] * len(pages)
+                for i, page in enumerate(pages):
+                    parts[i] = page.extract_text() or ""
+            return "\n".join(parts)
         except Exception as e:
             logger.error(f"Error extracting PDF {file_path}: {e}")
             raise
     
     def _extract_from_docx(self, file_path: Path) -> str:
         """Extract text from .docx file"""
+        # Imported lazily so TXT-only workloads never load python-docx (and lxml)
+        from docx import Document
+
         try:
             doc = Document(file_path)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text
+            return "\n".join([paragraph.text for paragraph in doc.paragraphs])
         except Exception as e:
             logger.error(f"Error extracting DOCX {file_path}: {e}")
             raise
@@ -72,31 +93,71 @@ class DocumentProcessor:
         if not text.strip():
             return []
         
-        chunks = []
-        words = text.split()
+        if len(text) > NUMPY_SPLIT_THRESHOLD:
+            return self._split_text_numpy(text, chunk_size, chunk_size - chunk_overlap)
         
-        if len(words) <= chunk_size:
+        # Word boundaries as offsets into the original string, so each chunk is one slice
+        offsets = [(match.start(), match.end()) for match in _WS_RE.finditer(text)]
+        num_words = len(offsets)
+        
+        if num_words <= chunk_size:
             return [text]
         
-        for i in range(0, len(words), chunk_size - chunk_overlap):
-            chunk_words = words[i:i + chunk_size]
-            chunk = " ".join(chunk_words)
-            chunks.append(chunk)
+        chunks = []
+        for i in range(0, num_words, chunk_size - chunk_overlap):
+            end = min(i + chunk_size, num_words)
+            chunks.append(text[offsets[i][0]:offsets[end - 1][1]])
             
             # Break if we've reached the end
-            if i + chunk_size >= len(words):
+            if i + chunk_size >= num_words:
                 break
         
         return chunks
     
+    def _split_text_numpy(self, text: str, chunk_size: int, stride: int) -> List[str]:
+        """split_text for very long documents, with no per-word Python objects"""
+        # Imported lazily so small documents never pay for NumPy
+        import numpy as np
+        
+        # UTF-32 stores one code point per character, so array positions are string offsets
+        codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+        in_word = ~np.isin(codes, _WHITESPACE)
+        
+        # Words start and end where the mask flips; padding with False closes a word at either edge
+        edges = np.flatnonzero(np.diff(in_word, prepend=False, append=False))
+        word_starts, word_ends = edges[0::2], edges[1::2]
+        num_words = len(word_starts)
+        
+        if num_words <= chunk_size:
+            return [text]
+        
+        starts = np.arange(0, num_words, stride, dtype=np.int64)
+        
+        # Stop after the first window that reaches the end of the text
+        reaches_end = starts + chunk_size >= num_words
+        if reaches_end.any():
+            starts = starts[:int(np.argmax(reaches_end)) + 1]
+        ends = np.minimum(starts + chunk_size, num_words)
+        
+        char_starts = word_starts[starts].tolist()
+        char_ends = word_ends[ends - 1].tolist()
+        return [text[start:end] for start, end in zip(char_starts, char_ends)]
+    
     def get_document_info(self, file_path: str) -> dict:
         """Get basic information about a document"""
         file_path = Path(file_path)
+        stat_result = file_path.stat()
+        suffix = file_path.suffix
         
         return {
             "name": file_path.name,
-            "size": file_path.stat().st_size,
-            "extension": file_path.suffix,
-            "modified": file_path.stat().st_mtime,
-            "supported": file_path.suffix.lower() in self.supported_extensions
+            "size": stat_result.st_size,
+            "extension": suffix,
+            "modified": stat_result.st_mtime,
+            "supported": suffix.lower() in self.supported_extensions
         }
+
+def extract_and_split(file_path: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
+    """Extract and chunk a single file (module-level so it can run in a worker process)"""
+    processor = DocumentProcessor()
+    return processor.split_text(processor.extract_text(file_path), chunk_size=chunk_size, chunk_overlap=chunk_overlap)
@@ -0,0 +1,63 @@
+import numpy as np
+from typing import List
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+class ONNXEncoder:
+    """Sentence embedding model exported to ONNX Runtime, with SentenceTransformer-compatible encode()"""
+    
+    def __init__(self, model_name: str, device: str = "cpu"):
+        try:
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+        except ImportError as e:
+            raise ImportError("ONNX encoding requires optimum: pip install 'optimum[onnxruntime]'") from e
+        
+        # Short names such as all-MiniLM-L6-v2 live under the sentence-transformers organization
+        model_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+        provider = "CUDAExecutionProvider" if device == "cuda" else "CPUExecutionProvider"
+        
+        self.tokenizer = AutoTokenizer.from_pretrained(model_id)
+        self.model = ORTModelForFeatureExtraction.from_pretrained(model_id, export=True, provider=provider)
+        # Truncate where SentenceTransformer does, so vectors match the ones it would produce
+        self.max_seq_length = self._load_max_seq_length(model_id)
+        logger.info(f"Loaded ONNX encoder for {model_id} ({provider})")
+    
+    def _load_max_seq_length(self, model_id: str) -> int:
+        """max_seq_length from the model's sentence_bert_config.json, else the tokenizer's own limit"""
+        from huggingface_hub import hf_hub_download
+        
+        try:
+            with open(hf_hub_download(model_id, "sentence_bert_config.json")) as f:
+                return int(json.load(f)["max_seq_length"])
+        except Exception as e:
+            logger.warning(f"No sentence-transformers max_seq_length for {model_id} ({e}), using the tokenizer limit")
+            return self.tokenizer.model_max_length
+    
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.config.hidden_size
+    
+    def encode(self, sentences: List[str], batch_size: int = 32, convert_to_numpy: bool = True,
+               normalize_embeddings: bool = False, show_progress_bar: bool = False) -> np.ndarray:
+        """Mean-pooled (optionally L2-normalized) float32 embeddings, one row per sentence"""
+        embeddings = np.empty((len(sentences), self.get_sentence_embedding_dimension()), dtype=np.float32)
+        
+        # Group similar lengths per batch so little work is spent on padding
+        order = np.argsort([len(sentence) for sentence in sentences], kind="stable")
+        for start in range(0, len(sentences), batch_size):
+            batch = order[start:start + batch_size]
+            inputs = self.tokenizer([sentences[i] for i in batch], padding=True, truncation=True,
+                                    max_length=self.max_seq_length, return_tensors="np")
+            token_embeddings = self.model(**inputs).last_hidden_state
+            
+            # Mean pooling over real (non-padding) tokens
+            mask = inputs["attention_mask"][..., np.newaxis].astype(np.float32)
+            pooled = (token_embeddings * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+            
+            if normalize_embeddings:
+                pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            embeddings[batch] = pooled
+        
+        return embeddings
@@ -1,14 +1,89 @@
-from typing import List, Tuple, Optional
+from typing import AsyncIterator, Iterable, List, NamedTuple, Tuple, Optional
+import asyncio
+from collections import OrderedDict
+from functools import lru_cache
+import io
 import logging
+import re
+import threading
+import time
 from langchain.schema import Document
-from huggingface_hub import InferenceClient
+from huggingface_hub import AsyncInferenceClient, InferenceClient
+
+from .search_result import SearchResult
 
 logger = logging.getLogger(__name__)
 
+# How long a model connection probe result is reused before hitting the endpoint again
+CONNECTION_CHECK_TTL = 60
+
+# Number of (retrieved chunk set, question) -> answer entries kept in memory
+ANSWER_CACHE_SIZE = 256
+
+# Sentence boundary: whitespace following terminal punctuation (keeps decimals like "3.14" intact)
+_SENT_RE = re.compile(r'(?<=[.!?])\s+')
+
+# Process-related wording in a chunk, and step markers within its sentences
+_PROCESS_RE = re.compile(r'step|process|method|algorithm', re.IGNORECASE)
+_PROC_RE = re.compile(r'step|first|then|next|finally', re.IGNORECASE)
+
+def _strip_period(sentence: str) -> str:
+    """Strip surrounding whitespace and a trailing period so sentences can be re-joined with '. '"""
+    return sentence.strip().rstrip('.')
+
+@lru_cache(maxsize=1024)
+def _match_keywords(question: str, doc_re: "re.Pattern", generic_re: "re.Pattern") -> Tuple[bool, bool]:
+    """Whether a question contains document keywords and generic question patterns"""
+    return bool(doc_re.search(question)), bool(generic_re.search(question))
+
+@lru_cache(maxsize=512)
+def _doc_views(content: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Sentences and lines of a chunk, computed once per content"""
+    return tuple(_SENT_RE.split(content)), tuple(content.split('\n'))
+
+class Answer(NamedTuple):
+    """An answer, and whether it came from the model rather than a local fallback or error message"""
+    text: str
+    from_model: bool
+
+class AnswerStream:
+    """Answer pieces to iterate over; once exhausted, from_model tells whether the model produced a complete answer"""
+    
+    __slots__ = ('_pieces', 'from_model')
+    
+    def __init__(self):
+        self._pieces: Optional[AsyncIterator[str]] = None
+        self.from_model = False
+    
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._pieces
+
 class RAGPipeline:
     """RAG pipeline for question answering using Hugging Face models"""
     
-    def __init__(self, YOUR_HF_TOKEN_HERE: str, model: str = "microsoft/DialoGPT-medium"):
+    __slots__ = (
+        'YOUR_HF_TOKEN_HERE', 'model', 'client', 'general_client', 'text_client',
+        'async_client', 'async_general_client', 'async_text_client',
+        '_doc_re', '_generic_re', '_connection_check', '_answer_cache', '_answer_lock'
+    )
+    
+    # Question type detection keywords, shared by every pipeline
+    DOCUMENT_KEYWORDS = frozenset({
+        'machine learning', 'ml', 'ai', 'artificial intelligence', 'neural network',
+        'algorithm', 'model', 'training', 'data', 'learning', 'rag', 'retrieval',
+        'document', 'text', 'embedding', 'vector', 'classification', 'regression'
+    })
+    
+    GENERIC_KEYWORDS = frozenset({
+        'what is', 'tell me', 'explain', 'how', 'why', 'when', 'where', 'who',
+        'define', 'describe', 'list', 'example', 'help', 'can you'
+    })
+    
+    def __init__(self, YOUR_HF_TOKEN_HERE: str, model: Optional[str] = None):
+        if model is None:
+            from config import Config
+            
+            model = Config.get_model("gen")
         self.YOUR_HF_TOKEN_HERE = YOUR_HF_TOKEN_HERE
         self.model = model
         self.client = InferenceClient(model=model, token=YOUR_HF_TOKEN_HERE)
@@ -16,71 +91,231 @@ class RAGPipeline:
         self.general_client = InferenceClient(model="gpt2", token=YOUR_HF_TOKEN_HERE)
         self.text_client = InferenceClient(model="google/flan-t5-base", token=YOUR_HF_TOKEN_HERE)
         
-        # Question type detection keywords
-        self.document_keywords = {
-            'machine learning', 'ml', 'ai', 'artificial intelligence', 'neural network',
-            'algorithm', 'model', 'training', 'data', 'learning', 'rag', 'retrieval',
-            'document', 'text', 'embedding', 'vector', 'classification', 'regression'
-        }
+        # Async counterparts used to race generation strategies concurrently
+        self.async_client = AsyncInferenceClient(model=model, token=YOUR_HF_TOKEN_HERE)
+        self.async_general_client = AsyncInferenceClient(model="gpt2", token=YOUR_HF_TOKEN_HERE)
+        self.async_text_client = AsyncInferenceClient(model="google/flan-t5-base", token=YOUR_HF_TOKEN_HERE)
+        
+        # Keyword sets compiled into single alternations so each check is one C-level scan
+        self._doc_re = self._compile_keywords(self.DOCUMENT_KEYWORDS)
+        self._generic_re = self._compile_keywords(self.GENERIC_KEYWORDS)
         
-        self.generic_keywords = {
-            'what is', 'tell me', 'explain', 'how', 'why', 'when', 'where', 'who',
-            'define', 'describe', 'list', 'example', 'help', 'can you'
-        }
+        # Last connection probe as (timestamp, result)
+        self._connection_check: Optional[Tuple[float, bool]] = None
         
+        # Answers keyed by the retrieved chunk set and question, most recently used last
+        self._answer_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        # generate_answer runs on many worker threads at once
+        self._answer_lock = threading.Lock()
+        
+    @staticmethod
+    def _compile_keywords(keywords) -> "re.Pattern":
+        """Compile a keyword set into a case-insensitive regex matching any keyword as a substring"""
+        return re.compile("|".join(map(re.escape, sorted(keywords, key=len, reverse=True))), re.IGNORECASE)
+    
     def generate_answer(self, question: str, relevant_docs: List[Tuple[Document, float]], 
                        max_tokens: int = 512) -> str:
         """Generate answer using RAG approach or general knowledge with enhanced detection"""
         try:
-            # Enhanced question analysis
-            question_type = self._analyze_question_type(question, relevant_docs)
+            # No relevant context and nothing to go on: skip the remote model entirely
+            if self._lacks_signal(question, relevant_docs):
+                return self._provide_smart_fallback(question, [])
             
-            if question_type == "document_based":
-                # Document-based answer
-                context_parts = []
-                for doc, score in relevant_docs:
-                    if score > 0.3:  # Only use highly relevant documents
-                        context_parts.append(f"Document: {doc.page_content[:500]}")
-                
-                context = "\n\n".join(context_parts)
-                prompt = self._create_rag_prompt(question, context)
-                logger.info(f"Using document-based approach for: {question[:50]}...")
-                
-            elif question_type == "hybrid":
-                # Hybrid approach - use documents + general knowledge
-                context_parts = []
-                for doc, score in relevant_docs:
-                    if score > 0.2:  # Lower threshold for hybrid
-                        context_parts.append(f"Reference: {doc.page_content[:300]}")
-                
-                context = "\n\n".join(context_parts)
-                prompt = self._create_hybrid_prompt(question, context)
-                logger.info(f"Using hybrid approach for: {question[:50]}...")
-                
-            else:
-                # Pure general knowledge
-                prompt = self._create_general_prompt(question)
-                logger.info(f"Using general knowledge for: {question[:50]}...")
+            cache_key = self._answer_cache_key(question, relevant_docs, max_tokens)
+            cached_answer = self._get_cached_answer(cache_key)
+            if cached_answer is not None:
+                return cached_answer
+            
+            prompt, question_type = self._build_prompt(question, relevant_docs)
             
             # Enhanced generation with multiple strategies
             answer = self._try_enhanced_generation(prompt, question_type, max_tokens, question)
+            if answer is None:
+                return self._local_answer(prompt, question)
             
-            return self._post_process_answer(answer, question)
+            return self._cache_answer(cache_key, self._post_process_answer(answer, question))
             
         except Exception as e:
             logger.error(f"Error generating answer: {e}")
             return f"I'm sorry, I encountered an error while generating the answer: {str(e)}"
     
-    def _create_rag_prompt(self, question: str, context: str) -> str:
+    async def agenerate_answer(self, question: str, relevant_docs: List[Tuple[Document, float]], 
+                               max_tokens: int = 512) -> str:
+        """Async variant of generate_answer that races all generation strategies concurrently"""
+        return (await self.agenerate_answer_with_origin(question, relevant_docs, max_tokens)).text
+    
+    async def agenerate_answer_with_origin(self, question: str, relevant_docs: List[Tuple[Document, float]], 
+                                           max_tokens: int = 512) -> Answer:
+        """agenerate_answer, also telling whether the answer came from the model (so callers may cache it)"""
+        try:
+            # No relevant context and nothing to go on: skip the remote model entirely
+            if self._lacks_signal(question, relevant_docs):
+                return Answer(self._provide_smart_fallback(question, []), False)
+            
+            cache_key = self._answer_cache_key(question, relevant_docs, max_tokens)
+            cached_answer = self._get_cached_answer(cache_key)
+            if cached_answer is not None:
+                return Answer(cached_answer, True)  # Only model answers are cached
+            
+            prompt, question_type = self._build_prompt(question, relevant_docs)
+            
+            answer = await self._agenerate_concurrently(prompt, question_type, max_tokens, question)
+            if answer is None:
+                return Answer(self._local_answer(prompt, question), False)
+            
+            return Answer(self._cache_answer(cache_key, self._post_process_answer(answer, question)), True)
+            
+        except Exception as e:
+            logger.error(f"Error generating answer: {e}")
+            return Answer(f"I'm sorry, I encountered an error while generating the answer: {str(e)}", False)
+    
+    async def agenerate_answer_stream(self, question: str, relevant_docs: List[Tuple[Document, float]], 
+                                      max_tokens: int = 512) -> AsyncIterator[str]:
+        """Stream the answer token by token, falling back to the full answer if streaming fails"""
+        async for piece in self.stream_answer(question, relevant_docs, max_tokens):
+            yield piece
+    
+    def stream_answer(self, question: str, relevant_docs: List[Tuple[Document, float]], 
+                      max_tokens: int = 512) -> AnswerStream:
+        """agenerate_answer_stream, also telling once exhausted whether the answer came from the model"""
+        stream = AnswerStream()
+        stream._pieces = self._stream_pieces(question, relevant_docs, max_tokens, stream)
+        return stream
+    
+    async def _stream_pieces(self, question: str, relevant_docs: List[Tuple[Document, float]], 
+                             max_tokens: int, stream: AnswerStream) -> AsyncIterator[str]:
+        """Answer pieces for stream_answer, setting stream.from_model only for complete model answers"""
+        # Same short-circuits as generate_answer; a local or cached answer is sent as a single chunk
+        if self._lacks_signal(question, relevant_docs):
+            yield self._provide_smart_fallback(question, [])
+            return
+        
+        cache_key = self._answer_cache_key(question, relevant_docs, max_tokens)
+        cached_answer = self._get_cached_answer(cache_key)
+        if cached_answer is not None:
+            stream.from_model = True  # Only model answers are cached
+            yield cached_answer
+            return
+        
+        prompt, question_type = self._build_prompt(question, relevant_docs)
+        client = self.async_text_client if question_type == "general" else self.async_client
+        
+        tokens = []
+        try:
+            token_stream = await client.text_generation(
+                prompt, 
+                max_new_tokens=min(max_tokens, 256) if question_type == "general" else max_tokens,
+                temperature=0.7 if question_type == "general" else 0.6,
+                do_sample=True,
+                return_full_text=False,
+                stream=True
+            )
+            async for token in token_stream:
+                if token:
+                    tokens.append(token)
+                    yield token
+        except Exception as e:
+            if tokens:
+                logger.error(f"Streaming generation interrupted: {e}")
+                return
+            logger.warning(f"Streaming generation failed: {e}")
+        
+        if tokens:
+            # A complete model answer, so later (streamed or not) requests can reuse it
+            self._cache_answer(cache_key, self._post_process_answer("".join(tokens), question))
+            stream.from_model = True
+        else:
+            # Nothing was produced, so fall back to the non-streaming strategies
+            answer = await self.agenerate_answer_with_origin(question, relevant_docs, max_tokens)
+            stream.from_model = answer.from_model
+            yield answer.text
+    
+    def _lacks_signal(self, question: str, relevant_docs: List[Tuple[Document, float]]) -> bool:
+        """True when no document clears the relevance floor and the question has no known keywords"""
+        if relevant_docs and SearchResult.from_pairs(relevant_docs).max_score > 0.2:
+            return False
+        return not any(_match_keywords(question, self._doc_re, self._generic_re))
+    
+    @staticmethod
+    def _answer_cache_key(question: str, relevant_docs: List[Tuple[Document, float]], max_tokens: int) -> tuple:
+        """Key an answer by the set of retrieved chunks, the question and the token budget"""
+        return frozenset(doc.page_content for doc, _ in relevant_docs), question.strip().lower(), max_tokens
+    
+    def _get_cached_answer(self, cache_key: tuple) -> Optional[str]:
+        """Return a previously generated answer for the same chunks and question, if any"""
+        with self._answer_lock:
+            answer = self._answer_cache.get(cache_key)
+            if answer is not None:
+                self._answer_cache.move_to_end(cache_key)
+        if answer is not None:
+            logger.info("Answer cache hit")
+        return answer
+    
+    def _cache_answer(self, cache_key: tuple, answer: str) -> str:
+        """Store an answer, evicting the least recently used entry when full"""
+        with self._answer_lock:
+            self._answer_cache[cache_key] = answer
+            if len(self._answer_cache) > ANSWER_CACHE_SIZE:
+                self._answer_cache.popitem(last=False)
+        return answer
+    
+    def _local_answer(self, prompt: str, question: str) -> str:
+        """Answer without the model when every generation strategy failed (never cached, so the model is retried)"""
+        answer = self._provide_smart_fallback(question if 'Question:' in prompt else prompt, [])
+        return self._post_process_answer(answer, question)
+    
+    def _build_prompt(self, question: str, relevant_docs: List[Tuple[Document, float]]) -> Tuple[str, str]:
+        """Analyze the question and build the prompt, returning (prompt, question_type)"""
+        # Scores live in one float32 array; the max and the filters below are single NumPy calls
+        results = SearchResult.from_pairs(relevant_docs)
+        
+        # Enhanced question analysis
+        question_type = self._analyze_question_type(question, results.max_score)
+        
+        if question_type == "document_based":
+            # Document-based answer (only highly relevant documents)
+            contexts = (doc.page_content[:500] for doc in results.filter(0.3))
+            prompt = self._create_rag_prompt(question, contexts)
+            logger.info(f"Using document-based approach for: {question[:50]}...")
+            
+        elif question_type == "hybrid":
+            # Hybrid approach - use documents + general knowledge (lower threshold)
+            contexts = (doc.page_content[:300] for doc in results.filter(0.2))
+            prompt = self._create_hybrid_prompt(question, contexts)
+            logger.info(f"Using hybrid approach for: {question[:50]}...")
+            
+        else:
+            # Pure general knowledge
+            prompt = self._create_general_prompt(question)
+            logger.info(f"Using general knowledge for: {question[:50]}...")
+        
+        return prompt, question_type
+    
+    @staticmethod
+    def _write_context_prompt(header: str, label: str, question: str, contexts: Iterable[str]) -> str:
+        """Write header, labelled context passages and question into a single buffer"""
+        buf = io.StringIO()
+        buf.write(header)
+        buf.write("\n\nContext:\n")
+        
+        separator = ""
+        for context in contexts:
+            buf.write(separator)
+            buf.write(label)
+            buf.write(context)
+            separator = "\n\n"
+        
+        buf.write("\n\nQuestion: ")
+        buf.write(question)
+        buf.write("\n\nAnswer:")
+        return buf.getvalue()
+    
+    def _create_rag_prompt(self, question: str, contexts: Iterable[str]) -> str:
         """Create a well-formatted prompt for document-based questions"""
-        return f"""Based on the following context, please answer the question accurately and concisely.
-
-Context:
-{context}
-
-Question: {question}
-
-Answer:"""
+        return self._write_context_prompt(
+            "Based on the following context, please answer the question accurately and concisely.",
+            "Document: ", question, contexts
+        )
 
     def _create_general_prompt(self, question: str) -> str:
         """Create a prompt for general knowledge questions"""
@@ -90,31 +325,22 @@ Question: {question}
 
 Answer:"""
     
-    def _create_hybrid_prompt(self, question: str, context: str) -> str:
+    def _create_hybrid_prompt(self, question: str, contexts: Iterable[str]) -> str:
         """Create a prompt that combines document context with general knowledge"""
-        return f"""Answer the following question using both the provided context and your general knowledge. 
-If the context is relevant, use it as supporting information. If not sufficient, expand with general knowledge.
-
-Context:
-{context}
-
-Question: {question}
-
-Answer:"""
+        return self._write_context_prompt(
+            "Answer the following question using both the provided context and your general knowledge. \n"
+            "If the context is relevant, use it as supporting information. If not sufficient, expand with general knowledge.",
+            "Reference: ", question, contexts
+        )
     
-    def _analyze_question_type(self, question: str, relevant_docs: List[Tuple[Document, float]]) -> str:
+    def _analyze_question_type(self, question: str, max_score: float) -> str:
         """Analyze question to determine the best answering approach"""
-        question_lower = question.lower()
-        
         # Check document relevance
-        has_high_relevance = relevant_docs and any(score > 0.4 for _, score in relevant_docs)
-        has_medium_relevance = relevant_docs and any(score > 0.2 for _, score in relevant_docs)
-        
-        # Check for document-specific keywords
-        has_doc_keywords = any(keyword in question_lower for keyword in self.document_keywords)
+        has_high_relevance = max_score > 0.4
+        has_medium_relevance = max_score > 0.2
         
-        # Check for generic question patterns
-        has_generic_patterns = any(pattern in question_lower for pattern in self.generic_keywords)
+        # Check for document-specific keywords and generic question patterns (memoized per question)
+        has_doc_keywords, has_generic_patterns = _match_keywords(question, self._doc_re, self._generic_re)
         
         # Decision logic
         if has_high_relevance and has_doc_keywords:
@@ -124,8 +350,8 @@ Answer:"""
         else:
             return "general"
     
-    def _try_enhanced_generation(self, prompt: str, question_type: str, max_tokens: int, question: str = "") -> str:
-        """Enhanced generation with multiple strategies based on question type"""
+    def _try_enhanced_generation(self, prompt: str, question_type: str, max_tokens: int, question: str = "") -> Optional[str]:
+        """Enhanced generation with multiple strategies based on question type (None if all fail)"""
         
         # Strategy 1: Try the most appropriate model first
         try:
@@ -165,9 +391,9 @@ Answer:"""
         answer = answer.strip()
         
         # Remove incomplete sentences at the end
-        sentences = answer.split('.')
-        if len(sentences) > 1 and len(sentences[-1].strip()) < 10:
-            answer = '.'.join(sentences[:-1]) + '.'
+        last_period = answer.rfind('.')
+        if last_period != -1 and len(answer[last_period + 1:].strip()) < 10:
+            answer = answer[:last_period + 1]
         
         # Ensure the answer is not too repetitive
         words = answer.split()
@@ -177,8 +403,8 @@ Answer:"""
         
         return answer
     
-    def _try_generation_methods(self, prompt: str, max_tokens: int, question: str = "") -> str:
-        """Try different generation methods with fallbacks"""
+    def _try_generation_methods(self, prompt: str, max_tokens: int, question: str = "") -> Optional[str]:
+        """Try different generation methods with fallbacks (None if all fail)"""
         
         # Method 1: Try text generation
         try:
@@ -209,8 +435,7 @@ Answer:"""
         
         # Method 3: Try with different model
         try:
-            fallback_client = InferenceClient(model="gpt2", token=self.YOUR_HF_TOKEN_HERE)
-            response = fallback_client.text_generation(
+            response = self.general_client.text_generation(
                 prompt, 
                 max_new_tokens=min(max_tokens, 200),
                 temperature=0.8
@@ -220,8 +445,61 @@ Answer:"""
         except Exception as e:
             logger.warning(f"Fallback generation failed: {e}")
         
-        # Method 4: Smart extraction and fallback
-        return self._provide_smart_fallback(question if 'Question:' in prompt else prompt, [])
+        # Every model failed; the caller falls back to a local answer
+        return None
+    
+    async def _agenerate_concurrently(self, prompt: str, question_type: str, max_tokens: int, question: str = "") -> Optional[str]:
+        """Fire every generation strategy at once and return the first acceptable response (None if all fail)"""
+        primary_client = self.async_text_client if question_type == "general" else self.async_client
+        
+        async def primary():
+            return await primary_client.text_generation(
+                prompt, 
+                max_new_tokens=min(max_tokens, 256) if question_type == "general" else max_tokens,
+                temperature=0.7 if question_type == "general" else 0.6,
+                do_sample=True,
+                return_full_text=False
+            )
+        
+        async def chat():
+            messages = [{"role": "user", "content": prompt}]
+            response = await self.async_client.chat_completion(
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=0.7
+            )
+            return response.choices[0].message.content if response and response.choices else None
+        
+        async def fallback():
+            return await self.async_general_client.text_generation(
+                prompt, 
+                max_new_tokens=min(max_tokens, 200),
+                temperature=0.8
+            )
+        
+        strategies = {"primary": primary, "chat": chat, "fallback": fallback}
+        tasks = {asyncio.ensure_future(strategy()): name for name, strategy in strategies.items()}
+        pending = set(tasks)
+        
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        logger.warning(f"{tasks[task].capitalize()} generation failed: {e}")
+                        continue
+                    
+                    if response and len(response.strip()) > 10:
+                        return response.strip()
+        finally:
+            # Cancel the strategies still in flight once one has won
+            for task in pending:
+                task.cancel()
+        
+        # Every strategy failed; the caller falls back to a local answer
+        return None
     
     def _extract_answer_from_context(self, prompt: str) -> str:
         """Extract a simple answer from the context when generation fails"""
@@ -232,16 +510,15 @@ Answer:"""
                 context_part = parts[0]
                 question = parts[1].split("Answer:")[0].strip()
                 
-                # Simple keyword-based extraction
-                context_sentences = context_part.split(".")
-                relevant_sentences = []
-                
+                # Simple keyword-based extraction, stopping once two sentences are found
                 question_words = set(question.lower().split())
+                relevant_sentences = []
                 
-                for sentence in context_sentences:
-                    sentence_words = set(sentence.lower().split())
-                    if len(question_words.intersection(sentence_words)) >= 2:
-                        relevant_sentences.append(sentence.strip())
+                for sentence in _SENT_RE.split(context_part):
+                    if len(question_words.intersection(sentence.lower().split())) >= 2:
+                        relevant_sentences.append(_strip_period(sentence))
+                        if len(relevant_sentences) == 2:
+                            break
                 
                 if relevant_sentences:
                     return ". ".join(relevant_sentences[:2]) + "."
@@ -263,10 +540,10 @@ Answer:"""
                 # Extract key information from documents
                 key_sentences = []
                 for doc, score in relevant_docs[:2]:  # Top 2 docs
-                    sentences = doc.page_content.split('.')
+                    sentences, _ = _doc_views(doc.page_content)
                     for sentence in sentences[:3]:  # First 3 sentences
                         if len(sentence.strip()) > 20:
-                            key_sentences.append(sentence.strip())
+                            key_sentences.append(_strip_period(sentence))
                 
                 if key_sentences:
                     return f"Based on the available information: {'. '.join(key_sentences[:2])}."
@@ -275,11 +552,10 @@ Answer:"""
             if relevant_docs:
                 # Look for process-related content
                 for doc, score in relevant_docs:
-                    content = doc.page_content.lower()
-                    if any(keyword in content for keyword in ['step', 'process', 'method', 'algorithm']):
+                    if _PROCESS_RE.search(doc.page_content):
                         # Extract process information
-                        sentences = doc.page_content.split('.')
-                        process_sentences = [s for s in sentences if any(k in s.lower() for k in ['step', 'first', 'then', 'next', 'finally'])]
+                        sentences, _ = _doc_views(doc.page_content)
+                        process_sentences = [_strip_period(s) for s in filter(_PROC_RE.search, sentences)]
                         if process_sentences:
                             return f"Here's the process: {'. '.join(process_sentences[:3])}."
         
@@ -287,8 +563,7 @@ Answer:"""
             if relevant_docs:
                 # Look for lists or examples
                 for doc, score in relevant_docs:
-                    content = doc.page_content
-                    lines = content.split('\n')
+                    _, lines = _doc_views(doc.page_content)
                     list_items = [line.strip() for line in lines if line.strip().startswith(('-', '•', '1.', '2.', '3.'))]
                     if list_items:
                         return f"Here are some key points: {', '.join(list_items[:5])}."
@@ -307,11 +582,18 @@ Answer:"""
             return f"I understand you're asking about '{question}'. While I don't have specific information readily available, I'd be happy to help if you could provide more context or try rephrasing your question."
     
     def test_model_connection(self) -> bool:
-        """Test if the model connection is working"""
+        """Test if the model connection is working (result is reused for CONNECTION_CHECK_TTL seconds)"""
+        now = time.monotonic()
+        if self._connection_check is not None and now - self._connection_check[0] < CONNECTION_CHECK_TTL:
+            return self._connection_check[1]
+        
         try:
             test_prompt = "Hello, this is a test."
             response = self.client.text_generation(test_prompt, max_new_tokens=10)
-            return True
+            connected = True
         except Exception as e:
             logger.error(f"Model connection test failed: {e}")
-            return False
+            connected = False
+        
+        self._connection_check = (now, connected)
+        return connected
@@ -0,0 +1,70 @@
+import asyncio
+from typing import Any, Awaitable, Callable, List, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Requests arriving within this window are dispatched together
+BATCH_WINDOW_MS = 20
+MAX_BATCH_SIZE = 8
+
+class RequestBatcher:
+    """Coalesce requests arriving within a short window and dispatch them concurrently"""
+    
+    def __init__(self, handler: Callable[..., Awaitable[Any]],
+                 window_ms: int = BATCH_WINDOW_MS, max_batch_size: int = MAX_BATCH_SIZE):
+        self.handler = handler
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        
+        # Created lazily so they bind to the running event loop
+        self._queue: "asyncio.Queue[Tuple[tuple, asyncio.Future]]" = None
+        self._worker: asyncio.Task = None
+        self._dispatches: Set[asyncio.Task] = set()
+    
+    async def submit(self, *args) -> Any:
+        """Queue a request and wait for its result"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.ensure_future(self._run())
+        
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((args, future))
+        return await future
+    
+    async def _run(self) -> None:
+        """Drain the queue into batches of up to max_batch_size or one window"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Dispatch without waiting so the next window can start collecting
+            task = asyncio.ensure_future(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+    
+    async def _dispatch(self, batch: List[Tuple[tuple, asyncio.Future]]) -> None:
+        """Run every request in the batch concurrently and resolve their futures"""
+        if len(batch) > 1:
+            logger.info(f"Dispatching batch of {len(batch)} requests")
+        
+        results = await asyncio.gather(*(self.handler(*args) for args, _ in batch), return_exceptions=True)
+        
+        for (_, future), result in zip(batch, results):
+            if future.done():  # Caller went away
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,49 @@
+import numpy as np
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+from langchain.schema import Document
+
+def source_name(metadata: Dict[str, Any]) -> str:
+    """File name of a chunk's source, precomputed at ingest time when available"""
+    return metadata.get("source_name") or Path(metadata.get("source", "Unknown")).name
+
+class SearchResult:
+    """Search hits stored as parallel document and score arrays
+    
+    Iterating, indexing and len() still behave like the old List[Tuple[Document, float]],
+    while score filtering and reductions run over a contiguous float32 array.
+    """
+    
+    __slots__ = ("docs", "scores")
+    
+    def __init__(self, docs: List[Document], scores: np.ndarray):
+        self.docs = docs
+        self.scores = np.asarray(scores, dtype=np.float32)
+    
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Tuple[Document, float]]) -> "SearchResult":
+        """Build from (document, score) pairs; returned unchanged if already a SearchResult"""
+        if isinstance(pairs, cls):
+            return pairs
+        pairs = list(pairs)
+        return cls([doc for doc, _ in pairs], np.fromiter((score for _, score in pairs), dtype=np.float32, count=len(pairs)))
+    
+    def filter(self, threshold: float) -> List[Document]:
+        """Documents whose score is above the threshold, in rank order"""
+        return [self.docs[i] for i in np.nonzero(self.scores > threshold)[0]]
+    
+    @property
+    def max_score(self) -> float:
+        """Highest score, or 0.0 when there are no hits"""
+        return float(self.scores.max()) if self.scores.size else 0.0
+    
+    def __len__(self) -> int:
+        return len(self.docs)
+    
+    def __iter__(self) -> Iterator[Tuple[Document, float]]:
+        return zip(self.docs, self.scores.tolist())
+    
+    def __getitem__(self, index: Union[int, slice]) -> Union[Tuple[Document, float], "SearchResult"]:
+        if isinstance(index, slice):
+            return SearchResult(self.docs[index], self.scores[index])
+        return self.docs[index], float(self.scores[index])
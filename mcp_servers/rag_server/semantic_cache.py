@@ -0,0 +1,150 @@
+import numpy as np
+from typing import Any, List, Optional
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# A persistent cache asks to be saved (see needs_save) once this many entries were added since the last save
+SAVE_EVERY = 32
+
+class SemanticCache:
+    """Cache answers keyed by question embedding, matched by cosine similarity"""
+    
+    def __init__(self, threshold: float = 0.92, cache_path: Optional[str] = None, max_size: Optional[int] = None):
+        self.threshold = threshold
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_size = max_size
+        
+        # Cached question embeddings (rows are L2-normalized, stored as fp16) and their answers;
+        # tags scope entries to request parameters that change the answer
+        self.embeddings: Optional[np.ndarray] = None
+        self.answers: List[Any] = []
+        self.tags: List[str] = []
+        
+        # Logical clock per entry for least-recently-used eviction
+        self._last_used: List[int] = []
+        self._clock = 0
+        
+        # Entries added since the last save; save() may run on a worker thread, so it snapshots the
+        # entries under _lock and serializes writes to cache_path with _save_lock
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        
+        # Load existing cache if available
+        self._load()
+    
+    def lookup(self, query_embedding: np.ndarray, tag: str = "") -> Optional[Any]:
+        """Return the cached answer for a semantically similar question with the same tag, if any"""
+        if not self.answers:
+            return None
+        
+        # Rows are pre-normalized, so cosine similarity is a single matrix-vector product;
+        # the fp16 rows are upcast on the fly, which is well within the threshold's tolerance
+        sims = self.embeddings.astype(np.float32) @ self._normalize(query_embedding)
+        sims[np.array(self.tags) != tag] = -np.inf
+        best = int(np.argmax(sims))
+        
+        if sims[best] > self.threshold:
+            logger.info(f"Semantic cache hit (similarity: {sims[best]:.3f})")
+            self._last_used[best] = self._tick()
+            return self.answers[best]
+        return None
+    
+    def add(self, query_embedding: np.ndarray, answer: Any, tag: str = "") -> None:
+        """Add a question embedding and its answer to the cache, evicting the least recently used entry when full
+        
+        Nothing is written here; call save() when needs_save is set and on shutdown.
+        """
+        row = self._normalize(query_embedding).astype(np.float16)[np.newaxis, :]
+        
+        with self._lock:
+            if self.max_size and len(self.answers) >= self.max_size:
+                self._evict(int(np.argmin(self._last_used)))
+            
+            self.embeddings = row if self.embeddings is None else np.vstack([self.embeddings, row])
+            self.answers.append(answer)
+            self.tags.append(tag)
+            self._last_used.append(self._tick())
+            self._unsaved += 1
+    
+    @property
+    def needs_save(self) -> bool:
+        """True when a persistent cache has SAVE_EVERY or more unsaved entries"""
+        return self.cache_path is not None and self._unsaved >= SAVE_EVERY
+    
+    def clear(self) -> None:
+        """Clear all cached answers"""
+        with self._lock:
+            self.embeddings = None
+            self.answers.clear()
+            self.tags.clear()
+            self._last_used.clear()
+            self._unsaved = 0
+        
+        with self._save_lock:
+            if self.cache_path and self.cache_path.exists():
+                self.cache_path.unlink()
+    
+    def __len__(self) -> int:
+        return len(self.answers)
+    
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        """Return a float32 copy of the vector with unit L2 norm"""
+        vector = np.asarray(vector, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+    
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+    
+    def _evict(self, index: int) -> None:
+        """Drop one entry from the cache"""
+        self.embeddings = np.delete(self.embeddings, index, axis=0)
+        del self.answers[index], self.tags[index], self._last_used[index]
+    
+    def save(self) -> None:
+        """Write the cache to disk if anything was added since the last save (safe to run off the event loop)
+        
+        Answers are stored as text, so they load back without pickle.
+        """
+        if not self.cache_path:
+            return
+        
+        with self._save_lock:
+            # Embedding arrays are replaced rather than modified in place, so the snapshot stays valid
+            with self._lock:
+                if not self._unsaved:
+                    return
+                embeddings, answers, tags = self.embeddings, list(self.answers), list(self.tags)
+                self._unsaved = 0
+            
+            try:
+                np.savez(self.cache_path, embeddings=embeddings,
+                         answers=np.array([str(answer) for answer in answers]), tags=np.array(tags))
+            except Exception as e:
+                logger.error(f"Error saving semantic cache: {e}")
+    
+    def _load(self) -> None:
+        """Load an existing cache from disk"""
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        
+        try:
+            with np.load(self.cache_path) as data:
+                self.embeddings = data["embeddings"].astype(np.float16)
+                self.answers = data["answers"].tolist()
+                self.tags = data["tags"].tolist() if "tags" in data else [""] * len(self.answers)
+            self._last_used = list(range(len(self.answers)))
+            self._clock = len(self.answers)
+            logger.info(f"Loaded semantic cache with {len(self.answers)} entries")
+        except Exception as e:
+            logger.warning(f"Error loading semantic cache: {e}, starting fresh")
+            self.embeddings = None
+            self.answers = []
+            self.tags = []
+            self._last_used = []
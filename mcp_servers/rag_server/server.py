@@ -14,6 +14,9 @@ import mcp.types as types
 from .document_processor import DocumentProcessor
 from .vector_store import VectorStore
 from .rag_pipeline import RAGPipeline
+from .search_result import source_name
+from .semantic_cache import SemanticCache
+from .request_batcher import RequestBatcher
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
@@ -24,6 +27,11 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class RAGServer:
+    __slots__ = (
+        'hf_token', 'documents_path', 'doc_processor', 'vector_store',
+        'rag_pipeline', 'semantic_cache', 'answer_batcher', 'server'
+    )
+    
     def __init__(self, hf_token: str, documents_path: str = "data"):
         self.hf_token = hf_token
         self.documents_path = Path(documents_path)
@@ -31,8 +39,16 @@ class RAGServer:
         
         # Initialize components
         self.doc_processor = DocumentProcessor()
-        self.vector_store = VectorStore()
+        self.vector_store = VectorStore(quantization=Config.VECTOR_QUANTIZATION,
+                                        index_type=Config.VECTOR_INDEX_TYPE,
+                                        ef_search=Config.VECTOR_EF_SEARCH,
+                                        use_gpu_index=Config.VECTOR_USE_GPU,
+                                        precision=Config.EMBEDDING_PRECISION,
+                                        use_onnx=Config.EMBEDDING_USE_ONNX)
         self.rag_pipeline = RAGPipeline(hf_token)
+        self.semantic_cache = SemanticCache(cache_path=str(self.vector_store.index_path / "semantic_cache.npz"))
+        # Questions arriving together are sent to HF as one concurrent batch
+        self.answer_batcher = RequestBatcher(self.rag_pipeline.agenerate_answer_with_origin)
         
         # MCP Server
         self.server = Server("rag-server")
@@ -130,6 +146,25 @@ class RAGServer:
                         "required": ["question"]
                     }
                 ),
+                Tool(
+                    name="ask_question_stream",
+                    description="Ask a question and stream the answer as it is generated (tokens are sent as log notifications)",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "question": {
+                                "type": "string",
+                                "description": "Question to ask about the documents"
+                            },
+                            "max_tokens": {
+                                "type": "integer",
+                                "description": "Maximum tokens in response",
+                                "default": 512
+                            }
+                        },
+                        "required": ["question"]
+                    }
+                ),
                 Tool(
                     name="get_document_summary",
                     description="Get a summary of all loaded documents",
@@ -156,6 +191,11 @@ class RAGServer:
                         arguments.get("question", ""),
                         arguments.get("max_tokens", 512)
                     )
+                elif name == "ask_question_stream":
+                    return await self._ask_question_stream(
+                        arguments.get("question", ""),
+                        arguments.get("max_tokens", 512)
+                    )
                 elif name == "get_document_summary":
                     return await self._get_document_summary()
                 else:
@@ -164,25 +204,50 @@ class RAGServer:
                 logger.error(f"Error in tool {name}: {e}")
                 return [types.TextContent(type="text", text=f"Error: {str(e)}")]
     
+    def _process_document(self, file_path: str) -> List[str]:
+        """Extract and split a single document (runs in a worker thread)"""
+        text = self.doc_processor.extract_text(file_path)
+        return self.doc_processor.split_text(text)
+    
     async def _load_documents(self, file_paths: List[str]) -> list[types.TextContent]:
         """Load documents into vector store"""
         results = []
         loaded_count = 0
         
-        for file_path in file_paths:
+        # Extract and split all files in parallel, off the event loop
+        processed = await asyncio.gather(
+            *(asyncio.to_thread(self._process_document, file_path) for file_path in file_paths),
+            return_exceptions=True
+        )
+        
+        all_chunks = []
+        all_metadata = []
+        loaded = []
+        for file_path, chunks in zip(file_paths, processed):
+            if isinstance(chunks, Exception):
+                results.append(f"❌ Failed to load {file_path}: {str(chunks)}")
+                continue
+            
+            all_chunks.extend(chunks)
+            all_metadata.extend([{"source": file_path, "source_name": Path(file_path).name}] * len(chunks))
+            loaded.append((file_path, len(chunks)))
+        
+        # Add every chunk to the vector store in one embedding batch
+        if all_chunks:
             try:
-                # Process document
-                text = self.doc_processor.extract_text(file_path)
-                chunks = self.doc_processor.split_text(text)
-                
-                # Add to vector store
-                self.vector_store.add_documents(chunks, [{"source": file_path}] * len(chunks))
-                loaded_count += 1
-                
-                results.append(f"✅ Loaded: {Path(file_path).name} ({len(chunks)} chunks)")
-                
+                self.vector_store.add_documents(all_chunks, all_metadata)
+                self.vector_store.flush()
             except Exception as e:
-                results.append(f"❌ Failed to load {file_path}: {str(e)}")
+                results.extend(f"❌ Failed to load {file_path}: {str(e)}" for file_path, _ in loaded)
+                loaded = []
+        
+        for file_path, chunk_count in loaded:
+            loaded_count += 1
+            results.append(f"✅ Loaded: {Path(file_path).name} ({chunk_count} chunks)")
+        
+        # Cached answers may be stale once new documents are indexed
+        if loaded_count:
+            self.semantic_cache.clear()
         
         summary = f"\n\nSummary: {loaded_count}/{len(file_paths)} documents loaded successfully."
         return [types.TextContent(type="text", text="\n".join(results) + summary)]
@@ -197,10 +262,9 @@ class RAGServer:
             
             formatted_results = []
             for i, (doc, score) in enumerate(results, 1):
-                source = doc.metadata.get("source", "Unknown")
                 formatted_results.append(
                     f"**Result {i}** (Score: {score:.3f})\n"
-                    f"Source: {Path(source).name}\n"
+                    f"Source: {source_name(doc.metadata)}\n"
                     f"Content: {doc.page_content[:300]}...\n"
                 )
             
@@ -212,20 +276,60 @@ class RAGServer:
     async def _ask_question(self, question: str, max_tokens: int) -> list[types.TextContent]:
         """Answer question using RAG pipeline"""
         try:
+            # Answer semantically duplicate questions without calling the model
+            question_embedding = self.vector_store.embed_query(question)
+            # Tagged by token budget: a short answer must not be served for a long request, or vice versa
+            cached_response = self.semantic_cache.lookup(question_embedding, tag=str(max_tokens))
+            if cached_response is not None:
+                return [types.TextContent(type="text", text=cached_response)]
+            
             # Get relevant documents
-            relevant_docs = self.vector_store.search(question, top_k=3)
+            relevant_docs = self.vector_store.search_by_embedding(question_embedding, top_k=3)
             
             if not relevant_docs:
                 return [types.TextContent(type="text", text="No relevant documents found to answer your question.")]
             
             # Generate answer using RAG
-            answer = self.rag_pipeline.generate_answer(question, relevant_docs, max_tokens)
+            answer, from_model = await self.answer_batcher.submit(question, relevant_docs, max_tokens)
             
             # Format response with sources
-            sources = list(set([Path(doc.metadata.get("source", "Unknown")).name 
-                              for doc, _ in relevant_docs]))
+            sources = list(dict.fromkeys(source_name(doc.metadata) for doc, _ in relevant_docs))
             
             response = f"**Answer:** {answer}\n\n**Sources:** {', '.join(sources)}"
+            # Local fallbacks and error messages (e.g. during an HF outage) are never cached or persisted
+            if from_model:
+                self.semantic_cache.add(question_embedding, response, tag=str(max_tokens))
+                if self.semantic_cache.needs_save:
+                    # Persisted in batches, off the event loop
+                    await asyncio.to_thread(self.semantic_cache.save)
+            return [types.TextContent(type="text", text=response)]
+            
+        except Exception as e:
+            return [types.TextContent(type="text", text=f"Error generating answer: {str(e)}")]
+    
+    async def _ask_question_stream(self, question: str, max_tokens: int) -> list[types.TextContent]:
+        """Answer question, pushing tokens to the client as they are generated"""
+        try:
+            relevant_docs = self.vector_store.search(question, top_k=3)
+            
+            if not relevant_docs:
+                return [types.TextContent(type="text", text="No relevant documents found to answer your question.")]
+            
+            # Tool results are sent once, so deltas go out as log notifications on the request's session
+            try:
+                session = self.server.request_context.session
+            except LookupError:
+                session = None
+            
+            chunks = []
+            async for token in self.rag_pipeline.agenerate_answer_stream(question, relevant_docs, max_tokens):
+                chunks.append(token)
+                if session is not None:
+                    await session.send_log_message(level="info", data=token, logger="ask_question_stream")
+            
+            sources = list(dict.fromkeys(source_name(doc.metadata) for doc, _ in relevant_docs))
+            
+            response = f"**Answer:** {''.join(chunks).strip()}\n\n**Sources:** {', '.join(sources)}"
             return [types.TextContent(type="text", text=response)]
             
         except Exception as e:
@@ -234,7 +338,7 @@ class RAGServer:
     async def _get_document_summary(self) -> list[types.TextContent]:
         """Get summary of loaded documents"""
         try:
-            stats = self.vector_store.get_stats()
+            stats = await asyncio.to_thread(self.vector_store.get_stats)
             return [types.TextContent(type="text", text=f"Vector Store Statistics:\n{json.dumps(stats, indent=2)}")]
         except Exception as e:
             return [types.TextContent(type="text", text=f"Error getting summary: {str(e)}")]
@@ -247,19 +351,23 @@ async def main():
     rag_server = RAGServer(HF_TOKEN)
     
     # Run the server
-    async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await rag_server.server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name="rag-server",
-                server_version="1.0.0",
-                capabilities=rag_server.server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
+    try:
+        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+            await rag_server.server.run(
+                read_stream,
+                write_stream,
+                InitializationOptions(
+                    server_name="rag-server",
+                    server_version="1.0.0",
+                    capabilities=rag_server.server.get_capabilities(
+                        notification_options=NotificationOptions(),
+                        experimental_capabilities={},
+                    ),
                 ),
-            ),
-        )
+            )
+    finally:
+        # Keep semantic cache entries added since the last batched save
+        await asyncio.to_thread(rag_server.semantic_cache.save)
 
 if __name__ == "__main__":
     asyncio.run(main())
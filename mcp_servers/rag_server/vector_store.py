@@ -1,28 +1,151 @@
 import numpy as np
-from typing import List, Tuple, Dict, Any, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 import logging
 from pathlib import Path
 import pickle
 import json
+import math
+import os
+import hashlib
+import shelve
+import threading
+from collections import Counter, OrderedDict
+from functools import lru_cache
 
 from sentence_transformers import SentenceTransformer
 import faiss
 from langchain.schema import Document
 
+from .search_result import SearchResult, source_name
+
 logger = logging.getLogger(__name__)
 
+# Mini-batch size for bulk encoding during ingestion
+ENCODE_BATCH_SIZE = 64
+
+# Recent query embeddings kept in memory, so a question asked again (or searched after being asked) skips the encoder
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Chunk embeddings kept in memory in front of the on-disk cache, most recently used last
+EMBEDDING_MEMO_SIZE = 8192
+
+# HNSW graph parameters
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+
+# IVF-PQ needs at least 2**nbits training vectors for its codebooks
+IVFPQ_NBITS = 8
+IVFPQ_MIN_TRAIN_SIZE = 2 ** IVFPQ_NBITS
+IVFPQ_NPROBE = 16
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+
+# Encoder weight precision: fp16 needs CUDA, int8 (dynamic quantization) runs on CPU
+PRECISIONS = ("fp32", "fp16", "int8")
+
+# Stored vector precision: None keeps float32, "fp16" halves and "int8" quarters index memory
+# (int8 uses a fixed [-1, 1] range per dimension, see VectorStore._train_unit_range)
+SCALAR_QUANTIZERS = {"fp16": faiss.ScalarQuantizer.QT_fp16, "int8": faiss.ScalarQuantizer.QT_8bit}
+
+@lru_cache(maxsize=None)
+def _configure_threads() -> int:
+    """Use every core for encoding and FAISS search (once per process); OMP_NUM_THREADS overrides"""
+    import torch
+    
+    num_threads = int(os.environ.get("OMP_NUM_THREADS") or os.cpu_count() or 4)
+    torch.set_num_threads(num_threads)
+    faiss.omp_set_num_threads(num_threads)
+    logger.info(f"Using {num_threads} threads for embedding and search")
+    return num_threads
+
+def _default_device() -> str:
+    """Encode on CUDA when a GPU is visible to torch"""
+    import torch
+    
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+@lru_cache(maxsize=None)
+def _gpu_resources() -> Optional["faiss.StandardGpuResources"]:
+    """Shared FAISS GPU resources, or None with a CPU-only faiss build"""
+    if not hasattr(faiss, "StandardGpuResources") or faiss.get_num_gpus() == 0:
+        return None
+    return faiss.StandardGpuResources()
+
 class VectorStore:
     """Vector store for document embeddings using FAISS"""
     
-    def __init__(self, embedding_model: str = "all-MiniLM-L6-v2", index_path: str = "vector_index"):
+    def __init__(self, embedding_model: Optional[str] = None, index_path: str = "vector_index",
+                 quantization: Optional[str] = None, index_type: str = "flat",
+                 device: Optional[str] = None, use_gpu_index: bool = False, mmap: bool = False,
+                 precision: str = "fp32", use_onnx: bool = False, ef_search: int = HNSW_EF_SEARCH):
+        _configure_threads()
+        
+        if embedding_model is None:
+            from config import Config
+            
+            embedding_model = Config.get_model("embedding")
         self.embedding_model_name = embedding_model
-        self.embedding_model = SentenceTransformer(embedding_model)
+        self.device = device or _default_device()
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision: {precision}")
+        
+        # Recorded with the index: the two encoders do not produce identical vectors
+        self.encoder = "onnx" if use_onnx else "sentence-transformers"
+        if use_onnx:
+            # ONNX Runtime's fused kernels replace eager PyTorch for encode()
+            from .onnx_encoder import ONNXEncoder
+            
+            self.embedding_model = ONNXEncoder(embedding_model, device=self.device)
+            if precision != "fp32":
+                logger.warning(f"{precision} precision is not applied to the ONNX encoder")
+            self.precision = "onnx"
+        else:
+            self.embedding_model = SentenceTransformer(embedding_model, device=self.device)
+            self.precision = self._apply_precision(precision)
         self.dimension = self.embedding_model.get_sentence_embedding_dimension()
+        # Per-instance, since cached vectors belong to this encoder; lru_cache is thread-safe
+        self._embed_query_cached = lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)(self._encode_query)
+        # Guarded by a lock because ingestion may run in several worker threads
+        self._embedding_memo: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memo_lock = threading.Lock()
+        
+        # Stored vector precision (see SCALAR_QUANTIZERS)
+        if quantization is not None and quantization not in SCALAR_QUANTIZERS:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+        self.quantization = quantization
+        
+        # Search structure: exact "flat" scan, "hnsw" graph, or "ivfpq" (trained on the first batch)
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unsupported index type: {index_type}")
+        self.index_type = index_type
+        # HNSW candidate list size per query: higher is more accurate, lower is faster
+        self.ef_search = ef_search
+        
+        # Optionally keep the index on GPU 0 (needs faiss-gpu); it is copied back to CPU to be saved
+        self.use_gpu_index = use_gpu_index
+        if use_gpu_index and _gpu_resources() is None:
+            logger.warning("GPU index requested but faiss has no GPU support, keeping the index on CPU")
+        
+        # Memory-map a saved IVF index instead of reading it into RAM (pages fault in on demand)
+        self.mmap = mmap
+        self._mmapped = False
         
         # FAISS index
-        self.index = faiss.IndexFlatIP(self.dimension)  # Inner product for cosine similarity
+        self.index = self._create_index()
         self.documents: List[Document] = []
-        self.embeddings: List[np.ndarray] = []
+        # Chunk count per source file name, kept up to date so get_stats never rescans documents
+        self._sources: Counter = Counter()
+        # Text of every stored chunk (references to page_content, so only the hash table costs memory)
+        self._contents: Set[str] = set()
+        
+        # Serializes index and document changes with searches and saves, which run on worker threads
+        self._lock = threading.RLock()
+        
+        # Set when documents were added since the last save; flush() writes them out
+        self._dirty = False
+        # Number of documents already in docs_file, which is an append-only stream of pickled batches
+        self._saved_count = 0
         
         # Paths for persistence
         self.index_path = Path(index_path)
@@ -30,94 +153,386 @@ class VectorStore:
         self.index_file = self.index_path / "faiss_index.bin"
         self.docs_file = self.index_path / "documents.pkl"
         self.metadata_file = self.index_path / "metadata.json"
+        self.embedding_cache_file = self.index_path / "embedding_cache"
+        
+        # One handle on the on-disk embedding cache, shared by every thread; dbm does not support
+        # concurrent access, so it is only touched under _cache_lock (closed by flush() and clear())
+        self._cache_lock = threading.Lock()
+        self._embedding_cache: Optional[shelve.Shelf] = shelve.open(str(self.embedding_cache_file))
         
         # Load existing index if available
         self._load_index()
     
     def add_documents(self, texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
         """Add documents to the vector store"""
+        # Generate embeddings, reusing cached vectors for chunks seen before
+        self.add_embeddings(self.embed_documents(texts), texts, metadatas)
+    
+    def add_new_documents(self, texts: List[str], metadatas: List[Dict[str, Any]]) -> int:
+        """Add only texts not already stored (nor repeated within texts); returns how many were added"""
+        new = self.new_chunk_indices(texts)
+        texts = [texts[i] for i in new]
+        metadatas = [metadatas[i] for i in new]
+        if not texts:
+            return 0
+        
+        # Embedding runs outside the lock so searches are not held up by ingestion
+        embeddings = self.embed_documents(texts)
+        
+        with self._lock:
+            # Re-check under the lock: a concurrent writer may have stored some of these meanwhile
+            keep = self.new_chunk_indices(texts)
+            if len(keep) < len(texts):
+                embeddings = embeddings[keep]
+                texts = [texts[i] for i in keep]
+                metadatas = [metadatas[i] for i in keep]
+            if texts:
+                self.add_embeddings(embeddings, texts, metadatas)
+        return len(texts)
+    
+    def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embed document chunks as L2-normalized float32 rows in one batched encoder pass"""
+        return self._encode(texts)
+    
+    def add_embeddings(self, embeddings: np.ndarray, texts: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Add documents whose embeddings were already computed with embed_documents()"""
         try:
             # Create Document objects
             new_docs = [Document(page_content=text, metadata=metadata) 
                        for text, metadata in zip(texts, metadatas)]
             
-            # Generate embeddings
-            embeddings = self.embedding_model.encode(texts, convert_to_numpy=True)
-            
-            # Normalize embeddings for cosine similarity
-            faiss.normalize_L2(embeddings)
+            # FAISS copies anything that is not C-contiguous float32; make sure it never has to
+            embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
             
-            # Add to FAISS index
-            self.index.add(embeddings)
+            # Vectors and documents are appended together, so FAISS ids always index self.documents
+            with self._lock:
+                # A memory-mapped index is read-only, so load it fully before the first add
+                if self._mmapped:
+                    self.index = faiss.read_index(str(self.index_file))
+                    self._mmapped = False
+                
+                # Add to FAISS index, training it first if it needs to be
+                if not self.index.is_trained:
+                    self._train_index(embeddings)
+                self.index.add(embeddings)
+                
+                # Store documents (vectors live only in the index; use index.reconstruct_n if needed)
+                self.documents.extend(new_docs)
+                self._count_sources(metadatas)
+                self._contents.update(texts)
+                
+                logger.info(f"Added {len(texts)} documents to vector store")
+                
+                # Saving is deferred to flush() so bulk ingestion writes the index once
+                self._dirty = True
             
-            # Store documents and embeddings
-            self.documents.extend(new_docs)
-            self.embeddings.extend(embeddings)
+        except Exception as e:
+            logger.error(f"Error adding documents: {e}")
+            raise
+    
+    def _apply_precision(self, precision: str) -> str:
+        """Cast or quantize the encoder weights, returning the precision actually in use"""
+        if precision == "fp16":
+            if self.device != "cuda":
+                logger.warning("fp16 encoding needs a CUDA device, keeping fp32")
+                return "fp32"
+            self.embedding_model = self.embedding_model.half()
+        elif precision == "int8":
+            if self.device != "cpu":
+                logger.warning("int8 dynamic quantization only runs on CPU, keeping fp32")
+                return "fp32"
+            import torch
             
-            logger.info(f"Added {len(texts)} documents to vector store")
+            self.embedding_model = torch.quantization.quantize_dynamic(
+                self.embedding_model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+        return precision
+    
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Embed texts, only running the encoder on content missing from the memory and on-disk caches"""
+        embeddings = np.empty((len(texts), self.dimension), dtype=np.float32)
+        # Keys include the model name and precision so switching either never reuses stale vectors
+        keys = [hashlib.blake2b(f"{self.embedding_model_name}\0{self.precision}\0{text}".encode("utf-8"),
+                                digest_size=16).hexdigest()
+                for text in texts]
+        
+        # In-memory hits skip opening the on-disk cache entirely
+        memo_misses = []
+        with self._memo_lock:
+            for i, key in enumerate(keys):
+                vector = self._embedding_memo.get(key)
+                if vector is None:
+                    memo_misses.append(i)
+                else:
+                    self._embedding_memo.move_to_end(key)
+                    embeddings[i] = vector
+        
+        misses = []
+        if memo_misses:
+            with self._cache_lock:
+                cache = self._open_embedding_cache()
+                for i in memo_misses:
+                    vector = cache.get(keys[i])
+                    if vector is None:
+                        misses.append(i)
+                    else:
+                        embeddings[i] = vector
             
-            # Save index
-            self._save_index()
+            if misses:
+                # L2-normalized (cosine similarity) in fixed-size mini-batches;
+                # encode() groups texts of similar length per batch, so little work is spent on padding
+                # (the cache lock is not held meanwhile, so other threads can still read it)
+                encoded = self.embedding_model.encode(
+                    [texts[i] for i in misses],
+                    batch_size=ENCODE_BATCH_SIZE,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False
+                )
+                embeddings[misses] = encoded
+                
+                with self._cache_lock:
+                    cache = self._open_embedding_cache()
+                    for i in misses:
+                        cache[keys[i]] = embeddings[i]
             
+            self._remember_embeddings((keys[i], embeddings[i].copy()) for i in memo_misses)
+        
+        if len(misses) < len(texts):
+            logger.info(f"Reused {len(texts) - len(misses)} cached embeddings")
+        return embeddings
+    
+    def _open_embedding_cache(self) -> shelve.Shelf:
+        """The on-disk embedding cache, reopened if flush() or clear() closed it; hold _cache_lock"""
+        if self._embedding_cache is None:
+            self._embedding_cache = shelve.open(str(self.embedding_cache_file))
+        return self._embedding_cache
+    
+    def _close_embedding_cache(self) -> None:
+        """Write the on-disk embedding cache out and release its handle"""
+        with self._cache_lock:
+            if self._embedding_cache is not None:
+                self._embedding_cache.close()
+                self._embedding_cache = None
+    
+    def _remember_embeddings(self, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        """Add embeddings to the in-memory cache, evicting the least recently used beyond EMBEDDING_MEMO_SIZE"""
+        with self._memo_lock:
+            for key, vector in items:
+                self._embedding_memo[key] = vector
+            while len(self._embedding_memo) > EMBEDDING_MEMO_SIZE:
+                self._embedding_memo.popitem(last=False)
+    
+    def warmup(self) -> None:
+        """Run a throwaway encode and search so the first real query doesn't pay lazy initialization"""
+        embeddings = self.embedding_model.encode(["warmup"] * 8, batch_size=8, convert_to_numpy=True,
+                                                 normalize_embeddings=True, show_progress_bar=False)
+        if self.index.ntotal > 0:
+            self._search_embeddings(np.ascontiguousarray(embeddings[:1], dtype=np.float32), 1)
+    
+    def flush(self) -> None:
+        """Save the index and documents if anything was added since the last save, and sync the embedding cache"""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+                self._dirty = False
+        self._close_embedding_cache()
+    
+    def search(self, query: str, top_k: int = 5) -> SearchResult:
+        """Search for similar documents (a repeated query reuses its cached embedding)"""
+        if self.index.ntotal == 0:
+            logger.warning("Vector store is empty")
+            return SearchResult([], np.empty(0, dtype=np.float32))
+        
+        try:
+            query_embedding = self.embed_query(query)
         except Exception as e:
-            logger.error(f"Error adding documents: {e}")
-            raise
+            logger.error(f"Error searching documents: {e}")
+            return SearchResult([], np.empty(0, dtype=np.float32))
+        return self.search_by_embedding(query_embedding, top_k)
     
-    def search(self, query: str, top_k: int = 5) -> List[Tuple[Document, float]]:
-        """Search for similar documents"""
+    def search_batch(self, queries: List[str], top_k: int = 5) -> List[SearchResult]:
+        """Search for several queries with one encode() call and one FAISS search"""
         try:
             if self.index.ntotal == 0:
                 logger.warning("Vector store is empty")
-                return []
+                return [SearchResult([], np.empty(0, dtype=np.float32)) for _ in queries]
             
-            # Generate query embedding
-            query_embedding = self.embedding_model.encode([query], convert_to_numpy=True)
-            faiss.normalize_L2(query_embedding)
+            query_embeddings = self.embedding_model.encode(
+                queries,
+                batch_size=32,
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                show_progress_bar=False
+            )
+            return self._search_embeddings(query_embeddings, top_k)
             
-            # Search
-            scores, indices = self.index.search(query_embedding, min(top_k, self.index.ntotal))
-            
-            # Format results
-            results = []
-            for score, idx in zip(scores[0], indices[0]):
-                if idx != -1:  # Valid index
-                    results.append((self.documents[idx], float(score)))
+        except Exception as e:
+            logger.error(f"Error searching documents: {e}")
+            return [SearchResult([], np.empty(0, dtype=np.float32)) for _ in queries]
+    
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed a single query as an L2-normalized float32 vector (read-only; shared with later calls)"""
+        return self._embed_query_cached(query)
+    
+    def _encode_query(self, query: str) -> np.ndarray:
+        vector = self.embedding_model.encode([query], convert_to_numpy=True, normalize_embeddings=True)[0]
+        vector.flags.writeable = False
+        return vector
+    
+    def search_by_embedding(self, query_embedding: np.ndarray, top_k: int = 5) -> SearchResult:
+        """Search for similar documents using an already computed query embedding"""
+        try:
+            if self.index.ntotal == 0:
+                logger.warning("Vector store is empty")
+                return SearchResult([], np.empty(0, dtype=np.float32))
             
-            return results
+            return self._search_embeddings(np.ascontiguousarray(query_embedding, dtype=np.float32).reshape(1, -1), top_k)[0]
             
         except Exception as e:
             logger.error(f"Error searching documents: {e}")
-            return []
+            return SearchResult([], np.empty(0, dtype=np.float32))
+    
+    def _search_embeddings(self, query_embeddings: np.ndarray, top_k: int) -> List[SearchResult]:
+        """Run one FAISS search over a matrix of query embeddings"""
+        # Search and document lookup see the same snapshot: no add or clear can land in between
+        with self._lock:
+            if self.index.ntotal == 0:
+                return [SearchResult([], np.empty(0, dtype=np.float32)) for _ in query_embeddings]
+            
+            scores, indices = self.index.search(query_embeddings, min(top_k, self.index.ntotal))
+            
+            # Format results, dropping invalid (-1) indices
+            results = []
+            for row_scores, row_indices in zip(scores, indices):
+                valid = row_indices != -1
+                results.append(SearchResult([self.documents[idx] for idx in row_indices[valid]], row_scores[valid]))
+        return results
+    
+    def _create_index(self, n_train: int = 0) -> faiss.Index:
+        """Create an empty inner-product index (cosine similarity on normalized vectors)"""
+        if self.index_type == "hnsw":
+            if self.quantization:
+                index = faiss.IndexHNSWSQ(self.dimension, SCALAR_QUANTIZERS[self.quantization], HNSW_M,
+                                          faiss.METRIC_INNER_PRODUCT)
+                self._train_unit_range(index)
+            else:
+                index = faiss.IndexHNSWFlat(self.dimension, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+            index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+            index.hnsw.efSearch = self.ef_search
+            return index  # No GPU implementation of HNSW
+        
+        if self.index_type == "ivfpq":
+            # Product quantization already compresses vectors, so the quantization setting is not used
+            nlist = max(1, int(4 * math.sqrt(n_train)))
+            m = next(m for m in range(self.dimension // 4, 0, -1) if self.dimension % m == 0)
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            index = faiss.IndexIVFPQ(quantizer, self.dimension, min(nlist, max(1, n_train)), m, IVFPQ_NBITS,
+                                     faiss.METRIC_INNER_PRODUCT)
+            index.nprobe = min(IVFPQ_NPROBE, index.nlist)
+            return self._to_device(index)
+        
+        if self.quantization:
+            # Vectors are stored as fp16/int8 codes and decoded on the fly during the scan
+            index = faiss.IndexScalarQuantizer(self.dimension, SCALAR_QUANTIZERS[self.quantization],
+                                               faiss.METRIC_INNER_PRODUCT)
+            self._train_unit_range(index)
+            return index
+        return self._to_device(faiss.IndexFlatIP(self.dimension))
+    
+    def _train_unit_range(self, index: faiss.Index) -> None:
+        """Train a scalar quantizer on the fixed range [-1, 1] per dimension
+        
+        Embeddings are L2-normalized, so no component leaves that range; learning the range from the
+        first batch (often a single file or chunk) would clamp every later vector into it instead.
+        """
+        if not index.is_trained:  # fp16 needs no training
+            index.train(np.vstack([-np.ones(self.dimension), np.ones(self.dimension)]).astype(np.float32))
+    
+    def _to_device(self, index: faiss.Index) -> faiss.Index:
+        """Move an index to the GPU when a GPU index was requested and is available"""
+        resources = _gpu_resources() if self.use_gpu_index else None
+        if resources is None:
+            return index
+        
+        try:
+            return faiss.index_cpu_to_gpu(resources, 0, index)
+        except Exception as e:
+            logger.warning(f"Could not move index to GPU: {e}, keeping it on CPU")
+            return index
+    
+    def _cpu_index(self) -> faiss.Index:
+        """The index as a CPU index, copying it back from the GPU if needed"""
+        if hasattr(faiss, "GpuIndex") and isinstance(self.index, faiss.GpuIndex):
+            return faiss.index_gpu_to_cpu(self.index)
+        return self.index
+    
+    def _train_index(self, embeddings: np.ndarray) -> None:
+        """Train an empty IVF-PQ index on its first batch, sizing the IVF lists from the batch"""
+        # Only IVF-PQ gets here: scalar quantizers are trained on a fixed range when created
+        if len(embeddings) < IVFPQ_MIN_TRAIN_SIZE:
+            logger.warning(f"Need at least {IVFPQ_MIN_TRAIN_SIZE} vectors to train {self.index_type}, "
+                           f"got {len(embeddings)}; using an exact flat index instead")
+            self.index = self._to_device(faiss.IndexFlatIP(self.dimension))
+            return
+        
+        self.index = self._create_index(n_train=len(embeddings))
+        self.index.train(embeddings)
+        logger.info(f"Trained {self.index_type} index on {len(embeddings)} vectors")
+    
+    def new_chunk_indices(self, texts: List[str]) -> List[int]:
+        """Indices of texts not yet stored, keeping only the first of any repeats within texts"""
+        new, seen = [], set()
+        with self._lock:
+            for i, text in enumerate(texts):
+                if text not in self._contents and text not in seen:
+                    seen.add(text)
+                    new.append(i)
+        return new
+    
+    def _count_sources(self, metadatas: Iterable[Dict[str, Any]]) -> None:
+        """Add chunks to the per-source counts"""
+        self._sources.update(source_name(metadata) for metadata in metadatas if "source" in metadata)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get vector store statistics"""
-        sources = set()
-        for doc in self.documents:
-            if "source" in doc.metadata:
-                sources.add(Path(doc.metadata["source"]).name)
+        with self._lock:
+            sources = list(self._sources)
+            total_documents = len(self.documents)
+            total_vectors = self.index.ntotal
         
         return {
-            "total_documents": len(self.documents),
-            "total_vectors": self.index.ntotal,
+            "total_documents": total_documents,
+            "total_vectors": total_vectors,
             "embedding_dimension": self.dimension,
             "embedding_model": self.embedding_model_name,
+            "device": self.device,
+            "precision": self.precision,
+            "quantization": self.quantization,
+            "index_type": self.index_type,
             "unique_sources": len(sources),
-            "sources": list(sources)
+            "sources": sources
         }
     
     def clear(self) -> None:
         """Clear all documents and reset index"""
-        self.index.reset()
-        self.documents.clear()
-        self.embeddings.clear()
-        
-        # Remove saved files
-        if self.index_file.exists():
-            self.index_file.unlink()
-        if self.docs_file.exists():
-            self.docs_file.unlink()
-        if self.metadata_file.exists():
-            self.metadata_file.unlink()
+        with self._lock:
+            self.index = self._create_index()  # Fresh index (HNSW graphs cannot be reset in place)
+            self.documents.clear()
+            self._sources.clear()
+            self._contents.clear()
+            self._mmapped = False
+            self._dirty = False
+            self._saved_count = 0
+            
+            # Remove saved files
+            if self.index_file.exists():
+                self.index_file.unlink()
+            if self.docs_file.exists():
+                self.docs_file.unlink()
+            if self.metadata_file.exists():
+                self.metadata_file.unlink()
+        self._close_embedding_cache()
         
         logger.info("Vector store cleared")
     
@@ -125,16 +540,24 @@ class VectorStore:
         """Save the index and documents to disk"""
         try:
             # Save FAISS index
-            faiss.write_index(self.index, str(self.index_file))
+            faiss.write_index(self._cpu_index(), str(self.index_file))
             
-            # Save documents
-            with open(self.docs_file, 'wb') as f:
-                pickle.dump(self.documents, f)
+            # Append only the documents added since the last save (rewrite if nothing is on disk yet)
+            # Stored as plain (text, metadata) tuples, which pickle smaller and load faster than Documents
+            mode = 'ab' if self._saved_count else 'wb'
+            with open(self.docs_file, mode) as f:
+                pickle.dump([(doc.page_content, doc.metadata) for doc in self.documents[self._saved_count:]],
+                            f, protocol=pickle.HIGHEST_PROTOCOL)
+            self._saved_count = len(self.documents)
             
             # Save metadata
             metadata = {
                 "embedding_model": self.embedding_model_name,
+                "encoder": self.encoder,
+                "precision": self.precision,
                 "dimension": self.dimension,
+                "quantization": self.quantization,
+                "index_type": self.index_type,
                 "document_count": len(self.documents)
             }
             with open(self.metadata_file, 'w') as f:
@@ -145,6 +568,18 @@ class VectorStore:
         except Exception as e:
             logger.error(f"Error saving index: {e}")
     
+    def _iter_saved_batches(self) -> Iterator[List[Document]]:
+        """Yield the documents of each pickled record in docs_file, in save order"""
+        with open(self.docs_file, 'rb') as f:
+            while True:
+                try:
+                    records = pickle.load(f)
+                except EOFError:
+                    return
+                # Older saves pickled Document objects directly
+                yield [item if isinstance(item, Document) else Document(page_content=item[0], metadata=item[1])
+                       for item in records]
+    
     def _load_index(self) -> None:
         """Load existing index and documents from disk"""
         try:
@@ -160,17 +595,47 @@ class VectorStore:
             if metadata["embedding_model"] != self.embedding_model_name:
                 logger.warning("Embedding model mismatch, starting fresh")
                 return
+            if metadata.get("encoder", "sentence-transformers") != self.encoder:
+                logger.warning("Embedding encoder mismatch, starting fresh")
+                return
+            if metadata.get("precision", "fp32") != self.precision:
+                logger.warning("Embedding precision mismatch, starting fresh")
+                return
+            if metadata.get("quantization") != self.quantization:
+                logger.warning("Index quantization mismatch, starting fresh")
+                return
+            if metadata.get("index_type", "flat") != self.index_type:
+                logger.warning("Index type mismatch, starting fresh")
+                return
             
             # Load FAISS index
-            self.index = faiss.read_index(str(self.index_file))
+            if self.mmap and self.index_type == "ivfpq" and not self.use_gpu_index:
+                # Only IVF inverted lists can be served straight from the mapped file
+                self.index = faiss.read_index(str(self.index_file), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+                self._mmapped = True
+            else:
+                self.index = self._to_device(faiss.read_index(str(self.index_file)))
+            
+            # efSearch is saved with the graph; apply the configured value instead
+            if self.index_type == "hnsw":
+                self.index.hnsw.efSearch = self.ef_search
             
-            # Load documents
-            with open(self.docs_file, 'rb') as f:
-                self.documents = pickle.load(f)
+            # Load documents record by record, so only one saved batch is unpickled at a time
+            documents = []
+            for batch in self._iter_saved_batches():
+                documents.extend(batch)
+                self._count_sources(doc.metadata for doc in batch)
+                self._contents.update(doc.page_content for doc in batch)
+            self.documents = documents
+            self._saved_count = len(documents)
             
             logger.info(f"Loaded existing index with {len(self.documents)} documents")
             
         except Exception as e:
             logger.warning(f"Error loading existing index: {e}, starting fresh")
-            self.index = faiss.IndexFlatIP(self.dimension)
+            self.index = self._create_index()
+            self._mmapped = False
             self.documents.clear()
+            self._sources.clear()
+            self._contents.clear()
+            self._saved_count = 0
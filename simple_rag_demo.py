@@ -4,16 +4,19 @@ Simple RAG Bot Demo - Standalone version without MCP
 This provides a simple interface to test the RAG functionality
 """
 
+import os
 import sys
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from config import Config
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent))
 
-from mcp_servers.rag_server.document_processor import DocumentProcessor
+from mcp_servers.rag_server.document_processor import DocumentProcessor, extract_and_split
 from mcp_servers.rag_server.vector_store import VectorStore
+from mcp_servers.rag_server.search_result import source_name
 from mcp_servers.rag_server.rag_pipeline import RAGPipeline
 
 logging.basicConfig(level=logging.INFO)
@@ -28,7 +31,13 @@ class SimpleRAGBot:
         # Initialize components
         print("🔧 Initializing RAG components...")
         self.doc_processor = DocumentProcessor()
-        self.vector_store = VectorStore(index_path="simple_rag_index")
+        self.vector_store = VectorStore(index_path="simple_rag_index",
+                                        quantization=Config.VECTOR_QUANTIZATION,
+                                        index_type=Config.VECTOR_INDEX_TYPE,
+                                        ef_search=Config.VECTOR_EF_SEARCH,
+                                        use_gpu_index=Config.VECTOR_USE_GPU,
+                                        precision=Config.EMBEDDING_PRECISION,
+                                        use_onnx=Config.EMBEDDING_USE_ONNX)
         self.rag_pipeline = RAGPipeline(YOUR_HF_TOKEN_HERE)
         
         print("✅ RAG Bot initialized successfully!")
@@ -47,19 +56,27 @@ class SimpleRAGBot:
         print(f"📁 Loading documents from: {directory_path}")
         
         # Process all supported files
-        for file_path in directory.glob("*"):
-            if file_path.is_file() and file_path.suffix.lower() in self.doc_processor.supported_extensions:
+        files = [file_path for file_path in directory.glob("*")
+                 if file_path.is_file() and file_path.suffix.lower() in self.doc_processor.supported_extensions]
+        if not files:
+            print("\n📊 Summary: 0 documents loaded, 0 total chunks")
+            return False
+        
+        # Extraction and chunking run in worker threads (spawned processes would each re-import
+        # this script and the embedding stack); vector store updates stay on this thread
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(files)))) as executor:
+            futures = {executor.submit(extract_and_split, str(file_path), 1000, 200): file_path
+                       for file_path in files}
+            
+            for future in as_completed(futures):
+                file_path = futures[future]
                 try:
                     print(f"  📄 Processing: {file_path.name}")
-                    
-                    # Extract text
-                    text = self.doc_processor.extract_text(str(file_path))
-                    
-                    # Split into chunks
-                    chunks = self.doc_processor.split_text(text, chunk_size=1000, chunk_overlap=200)
+                    chunks = future.result()
                     
                     # Add to vector store
-                    metadata = [{"source": str(file_path), "chunk_id": i} for i in range(len(chunks))]
+                    metadata = [{"source": str(file_path), "source_name": file_path.name, "chunk_id": i}
+                                for i in range(len(chunks))]
                     self.vector_store.add_documents(chunks, metadata)
                     
                     loaded_count += 1
@@ -70,6 +87,9 @@ class SimpleRAGBot:
                 except Exception as e:
                     print(f"    ❌ Failed to process {file_path.name}: {e}")
         
+        # Persist everything loaded above in one write
+        self.vector_store.flush()
+        
         print(f"\n📊 Summary: {loaded_count} documents loaded, {total_chunks} total chunks")
         return loaded_count > 0
     
@@ -85,8 +105,7 @@ class SimpleRAGBot:
         
         print(f"📋 Found {len(results)} relevant documents:")
         for i, (doc, score) in enumerate(results, 1):
-            source = Path(doc.metadata.get("source", "Unknown")).name
-            print(f"  {i}. Source: {source} (Score: {score:.3f})")
+            print(f"  {i}. Source: {source_name(doc.metadata)} (Score: {score:.3f})")
             print(f"     Preview: {doc.page_content[:100]}...")
         
         return results
@@ -106,8 +125,7 @@ class SimpleRAGBot:
         answer = self.rag_pipeline.generate_answer(question, relevant_docs, max_tokens=300)
         
         # Show sources
-        sources = list(set([Path(doc.metadata.get("source", "Unknown")).name 
-                          for doc, _ in relevant_docs]))
+        sources = list(dict.fromkeys(source_name(doc.metadata) for doc, _ in relevant_docs))
         
         print(f"\n💡 Answer: {answer}")
         print(f"\n📚 Sources: {', '.join(sources)}")
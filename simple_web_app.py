@@ -5,41 +5,67 @@ A basic HTML/JavaScript interface served by FastAPI
 """
 
 from fastapi import FastAPI, HTTPException, UploadFile, File, Request
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, ORJSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
+import asyncio
+import functools
 import os
+import time
 import sys
 from pathlib import Path
 from config import Config
 import logging
 import json
+import hashlib
+import gzip
 from tempfile import NamedTemporaryFile
-import shutil
+from concurrent.futures import ThreadPoolExecutor
+import aiofiles
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent))
 
-from mcp_servers.rag_server.document_processor import DocumentProcessor
-from mcp_servers.rag_server.vector_store import VectorStore
-from mcp_servers.rag_server.rag_pipeline import RAGPipeline
+from mcp_servers.rag_server.semantic_cache import SemanticCache
+from mcp_servers.rag_server.search_result import source_name
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Request bounds, so a single call can't demand an unbounded FAISS scan or generation
+MAX_QUERY_CHARS = 1024
+MAX_ANSWER_TOKENS = 2048
+MAX_TOP_K = 50
+
+# Answers generated at once; further /api/ask requests wait for a slot
+MAX_CONCURRENT_GENERATIONS = 4
+
 # Pydantic models
 class QuestionRequest(BaseModel):
-    question: str
-    max_tokens: Optional[int] = 300
+    question: str = Field(min_length=1, max_length=MAX_QUERY_CHARS)
+    max_tokens: int = Field(default=300, ge=16, le=MAX_ANSWER_TOKENS)
 
 class SearchRequest(BaseModel):
-    query: str
-    top_k: Optional[int] = 5
+    query: str = Field(min_length=1, max_length=MAX_QUERY_CHARS)
+    top_k: int = Field(default=5, ge=1, le=MAX_TOP_K)
+
+# Bytes read per await when copying an upload to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Near-duplicate queries (cosine similarity above the threshold) reuse earlier responses
+QUERY_CACHE_THRESHOLD = 0.95
+QUERY_CACHE_SIZE = 2048
+
+# Characters of each chunk shown in /api/search results
+PREVIEW_CHARS = 300
+
+# Seconds a /api/stats response is reused; ingestion invalidates it immediately
+STATS_TTL = 10
 
 # Initialize FastAPI app
-app = FastAPI(title="RAG Bot Simple Web UI", version="1.0.0")
+app = FastAPI(title="RAG Bot Simple Web UI", version="1.0.0", default_response_class=ORJSONResponse)
 
 # Global components
 # Configuration
@@ -47,15 +73,35 @@ HF_TOKEN = Config.get_YOUR_HF_TOKEN_HERE()
 doc_processor = None
 vector_store = None
 rag_pipeline = None
+ask_cache = SemanticCache(threshold=QUERY_CACHE_THRESHOLD, max_size=QUERY_CACHE_SIZE)
+search_cache = SemanticCache(threshold=QUERY_CACHE_THRESHOLD, max_size=QUERY_CACHE_SIZE)
+
+# Last stats response as (timestamp, stats)
+_stats_cache: Optional[tuple] = None
+
+# Query embedding and FAISS lookups run here so concurrent requests don't queue on the event loop
+search_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize RAG components on startup"""
     global doc_processor, vector_store, rag_pipeline
     
+    # Imported here rather than at module level: they pull in torch, transformers and faiss,
+    # which would otherwise slow down every reload and worker fork before the app even starts
+    from mcp_servers.rag_server.document_processor import DocumentProcessor
+    from mcp_servers.rag_server.vector_store import VectorStore
+    from mcp_servers.rag_server.rag_pipeline import RAGPipeline
+    
     logger.info("Initializing RAG components...")
     doc_processor = DocumentProcessor()
-    vector_store = VectorStore(index_path="simple_web_rag_index")
+    vector_store = VectorStore(index_path="simple_web_rag_index",
+                               quantization=Config.VECTOR_QUANTIZATION,
+                               index_type=Config.VECTOR_INDEX_TYPE,
+                               ef_search=Config.VECTOR_EF_SEARCH,
+                               use_gpu_index=Config.VECTOR_USE_GPU,
+                               precision=Config.EMBEDDING_PRECISION,
+                               use_onnx=Config.EMBEDDING_USE_ONNX)
     rag_pipeline = RAGPipeline(HF_TOKEN)
     
     # Auto-load documents from data directory
@@ -64,8 +110,59 @@ async def startup_event():
         logger.info("Auto-loading documents from data directory...")
         await load_documents_from_directory(str(data_dir))
     
+    # Pay model initialization (CUDA context, allocator, first kernels) and the first
+    # inference API connection now instead of on the first user request
+    try:
+        await asyncio.gather(asyncio.to_thread(vector_store.warmup),
+                             asyncio.to_thread(rag_pipeline.test_model_connection))
+    except Exception as e:
+        logger.warning(f"Warmup failed: {e}")
+    
     logger.info("RAG components initialized successfully!")
 
+_generation_semaphore = asyncio.Semaphore(MAX_CONCURRENT_GENERATIONS)
+
+# Caps concurrent extractions so large directories don't thrash the disk
+_extract_semaphore = asyncio.Semaphore(os.cpu_count() or 4)
+
+async def extract_chunks(file_path: str) -> List[str]:
+    """Extract and split one file in a worker thread, keeping the event loop free"""
+    async with _extract_semaphore:
+        return await asyncio.to_thread(
+            lambda: doc_processor.split_text(doc_processor.extract_text(file_path), chunk_size=1000, chunk_overlap=200)
+        )
+
+async def save_upload(file: UploadFile, path: str) -> None:
+    """Copy an upload to disk in chunks without blocking the event loop"""
+    async with aiofiles.open(path, "wb") as out:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await out.write(chunk)
+
+async def run_in_search_pool(func, *args, **kwargs):
+    """Run a blocking vector store call in the search pool"""
+    return await asyncio.get_running_loop().run_in_executor(search_pool, functools.partial(func, *args, **kwargs))
+
+async def add_documents_batched(chunks: List[str], metadata: List[dict]) -> int:
+    """Embed chunks from many files in one encoder call, add them together and save once
+    
+    Chunks whose exact text is already stored (or repeated earlier in this batch) are skipped
+    before embedding; returns how many were skipped.
+    """
+    global _stats_cache
+    
+    # Off the event loop; the store's lock keeps the add from interleaving with searches in search_pool
+    added = await asyncio.to_thread(vector_store.add_new_documents, chunks, metadata)
+    await asyncio.to_thread(vector_store.flush)
+    dedup_count = len(chunks) - added
+    if dedup_count:
+        logger.info(f"Skipping {dedup_count} duplicate chunks")
+    
+    # New documents can change any cached answer, result list or statistic
+    ask_cache.clear()
+    search_cache.clear()
+    _stats_cache = None
+    return dedup_count
+
 async def load_documents_from_directory(directory_path: str) -> dict:
     """Load documents from a directory"""
     directory = Path(directory_path)
@@ -74,574 +171,92 @@ async def load_documents_from_directory(directory_path: str) -> dict:
         return {"files_processed": 0, "chunks_added": 0, "error": "Directory not found"}
     
     files_processed = 0
-    total_chunks = 0
+    all_chunks = []
+    all_metadata = []
+    errors = []  # (file path, error)
     
-    for file_path in directory.glob("*"):
-        if file_path.is_file() and file_path.suffix.lower() in doc_processor.supported_extensions:
-            try:
-                text = doc_processor.extract_text(str(file_path))
-                chunks = doc_processor.split_text(text, chunk_size=1000, chunk_overlap=200)
-                metadata = [{"source": str(file_path), "chunk_id": i} for i in range(len(chunks))]
-                vector_store.add_documents(chunks, metadata)
-                
-                files_processed += 1
-                total_chunks += len(chunks)
-                
-            except Exception as e:
-                logger.error(f"Error processing {file_path}: {e}")
+    # Check the (already lower-case) extension set before stat()ing each entry
+    extensions = doc_processor.supported_extensions
+    file_paths = [str(file_path) for file_path in directory.iterdir()
+                  if file_path.suffix.lower() in extensions and file_path.is_file()]
+    results = await asyncio.gather(*(extract_chunks(file_path) for file_path in file_paths), return_exceptions=True)
     
-    return {"files_processed": files_processed, "chunks_added": total_chunks}
-
-# HTML Interface
-@app.get("/", response_class=HTMLResponse)
-async def get_web_interface():
-    """Serve the main web interface"""
-    return """
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>RAG Bot - Simple Web Interface</title>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { 
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            padding: 20px;
-        }
-        .container { 
-            max-width: 1200px; 
-            margin: 0 auto; 
-            background: white; 
-            border-radius: 20px; 
-            box-shadow: 0 20px 60px rgba(0,0,0,0.1);
-            overflow: hidden;
-        }
-        .header { 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white; 
-            padding: 30px; 
-            text-align: center;
-        }
-        .header h1 { font-size: 2.5em; margin-bottom: 10px; }
-        .header p { opacity: 0.9; font-size: 1.1em; }
-        .tabs { 
-            display: flex; 
-            background: #f8f9fa; 
-            border-bottom: 1px solid #e9ecef;
-        }
-        .tab { 
-            flex: 1; 
-            padding: 20px; 
-            cursor: pointer; 
-            border: none; 
-            background: none; 
-            font-size: 16px;
-            transition: all 0.3s;
-        }
-        .tab.active { 
-            background: white; 
-            border-bottom: 3px solid #667eea;
-            color: #667eea;
-            font-weight: bold;
-        }
-        .tab:hover { background: #e9ecef; }
-        .content { 
-            padding: 30px; 
-            min-height: 600px;
-        }
-        .hidden { display: none; }
-        .chat-container { 
-            height: 500px; 
-            border: 1px solid #e9ecef; 
-            border-radius: 10px;
-            display: flex;
-            flex-direction: column;
-        }
-        .messages { 
-            flex: 1; 
-            padding: 20px; 
-            overflow-y: auto; 
-            background: #f8f9fa;
-        }
-        .message { 
-            margin-bottom: 15px; 
-            padding: 15px 20px; 
-            border-radius: 18px; 
-            max-width: 80%;
-            animation: slideIn 0.3s ease;
-        }
-        .message.user { 
-            background: #667eea; 
-            color: white; 
-            margin-left: auto; 
-            text-align: right;
-        }
-        .message.bot { 
-            background: white; 
-            border: 1px solid #e9ecef;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        }
-        .message.error { 
-            background: #f8d7da; 
-            color: #721c24; 
-            border: 1px solid #f5c6cb;
-        }
-        .sources { 
-            margin-top: 10px; 
-            padding-top: 10px; 
-            border-top: 1px solid #e9ecef; 
-            font-size: 0.9em;
-            opacity: 0.8;
-        }
-        .input-area { 
-            padding: 20px; 
-            border-top: 1px solid #e9ecef; 
-            background: white;
-            display: flex;
-            gap: 10px;
-        }
-        .input-area input { 
-            flex: 1; 
-            padding: 15px; 
-            border: 1px solid #e9ecef; 
-            border-radius: 25px;
-            font-size: 16px;
-            outline: none;
-        }
-        .input-area input:focus { border-color: #667eea; }
-        .btn { 
-            padding: 15px 30px; 
-            border: none; 
-            border-radius: 25px; 
-            cursor: pointer; 
-            font-size: 16px;
-            transition: all 0.3s;
-        }
-        .btn-primary { 
-            background: #667eea; 
-            color: white; 
-        }
-        .btn-primary:hover { 
-            background: #5a67d8; 
-            transform: translateY(-2px);
-        }
-        .btn:disabled { 
-            opacity: 0.5; 
-            cursor: not-allowed; 
-            transform: none !important;
-        }
-        .form-group { 
-            margin-bottom: 20px; 
-        }
-        .form-group label { 
-            display: block; 
-            margin-bottom: 8px; 
-            font-weight: bold;
-            color: #333;
-        }
-        .form-group input, .form-group select { 
-            width: 100%; 
-            padding: 12px; 
-            border: 1px solid #e9ecef; 
-            border-radius: 8px;
-            font-size: 16px;
-        }
-        .results { 
-            margin-top: 20px; 
-        }
-        .result-item { 
-            background: white; 
-            border: 1px solid #e9ecef; 
-            border-radius: 10px; 
-            padding: 20px; 
-            margin-bottom: 15px;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        }
-        .result-header { 
-            display: flex; 
-            justify-content: between; 
-            align-items: center; 
-            margin-bottom: 10px;
-        }
-        .result-score { 
-            background: #667eea; 
-            color: white; 
-            padding: 4px 12px; 
-            border-radius: 15px; 
-            font-size: 0.9em;
-        }
-        .stats-grid { 
-            display: grid; 
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); 
-            gap: 20px;
-        }
-        .stat-card { 
-            background: white; 
-            border: 1px solid #e9ecef; 
-            border-radius: 10px; 
-            padding: 20px; 
-            text-align: center;
-            box-shadow: 0 2px 5px rgba(0,0,0,0.1);
-        }
-        .stat-number { 
-            font-size: 2.5em; 
-            font-weight: bold; 
-            color: #667eea; 
-            margin-bottom: 10px;
-        }
-        .upload-area { 
-            border: 2px dashed #e9ecef; 
-            border-radius: 10px; 
-            padding: 40px; 
-            text-align: center; 
-            margin-bottom: 20px;
-            transition: all 0.3s;
-        }
-        .upload-area:hover { 
-            border-color: #667eea; 
-            background: #f8f9fa;
-        }
-        .loading { 
-            display: inline-block; 
-            width: 20px; 
-            height: 20px; 
-            border: 3px solid #f3f3f3; 
-            border-top: 3px solid #667eea; 
-            border-radius: 50%; 
-            animation: spin 1s linear infinite;
-        }
-        @keyframes spin { 0% { transform: rotate(0deg); } 100% { transform: rotate(360deg); } }
-        @keyframes slideIn { from { opacity: 0; transform: translateY(10px); } to { opacity: 1; transform: translateY(0); } }
-        @media (max-width: 768px) {
-            .tabs { flex-direction: column; }
-            .message { max-width: 95%; }
-            .input-area { flex-direction: column; }
-            .container { margin: 10px; border-radius: 10px; }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🤖 RAG Bot</h1>
-            <p>Retrieval-Augmented Generation System</p>
-        </div>
+    for file_path, chunks in zip(file_paths, results):
+        if isinstance(chunks, Exception):
+            errors.append((file_path, repr(chunks)))
+            continue
         
-        <div class="tabs">
-            <button class="tab active" onclick="showTab('chat')">💬 Chat</button>
-            <button class="tab" onclick="showTab('search')">🔍 Search</button>
-            <button class="tab" onclick="showTab('upload')">📄 Upload</button>
-            <button class="tab" onclick="showTab('stats')">📊 Statistics</button>
-        </div>
-        
-        <div class="content">
-            <!-- Chat Tab -->
-            <div id="chat" class="tab-content">
-                <div class="chat-container">
-                    <div class="messages" id="messages">
-                        <div class="message bot">
-                            Hello! I'm your RAG Bot assistant. I can answer questions about the documents in my knowledge base. What would you like to know?
-                        </div>
-                    </div>
-                    <div class="input-area">
-                        <input type="text" id="chatInput" placeholder="Ask me anything about your documents..." onkeypress="handleChatKeyPress(event)">
-                        <button class="btn btn-primary" onclick="sendMessage()">Send</button>
-                    </div>
-                </div>
-            </div>
-            
-            <!-- Search Tab -->
-            <div id="search" class="tab-content hidden">
-                <div class="form-group">
-                    <label for="searchInput">Search Documents:</label>
-                    <input type="text" id="searchInput" placeholder="Enter your search query..." onkeypress="handleSearchKeyPress(event)">
-                </div>
-                <button class="btn btn-primary" onclick="searchDocuments()">Search</button>
-                <div id="searchResults" class="results"></div>
-            </div>
-            
-            <!-- Upload Tab -->
-            <div id="upload" class="tab-content hidden">
-                <div class="upload-area" onclick="document.getElementById('fileInput').click()">
-                    <h3>📄 Upload Documents</h3>
-                    <p>Click here to select files or drag and drop</p>
-                    <p><small>Supported: TXT, PDF, DOCX</small></p>
-                    <input type="file" id="fileInput" multiple accept=".txt,.pdf,.docx" style="display:none" onchange="uploadFiles()">
-                </div>
-                <div id="uploadResults"></div>
-            </div>
-            
-            <!-- Statistics Tab -->
-            <div id="stats" class="tab-content hidden">
-                <div class="stats-grid" id="statsGrid">
-                    <div class="stat-card">
-                        <div class="loading"></div>
-                        <p>Loading statistics...</p>
-                    </div>
-                </div>
-                <button class="btn btn-primary" onclick="loadStats()" style="margin-top: 20px;">Refresh Stats</button>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        let isLoading = false;
-
-        function showTab(tabName) {
-            // Hide all tab contents
-            document.querySelectorAll('.tab-content').forEach(content => {
-                content.classList.add('hidden');
-            });
-            
-            // Remove active class from all tabs
-            document.querySelectorAll('.tab').forEach(tab => {
-                tab.classList.remove('active');
-            });
-            
-            // Show selected tab content
-            document.getElementById(tabName).classList.remove('hidden');
-            
-            // Add active class to clicked tab
-            event.target.classList.add('active');
-            
-            // Load stats when stats tab is shown
-            if (tabName === 'stats') {
-                loadStats();
-            }
-        }
-
-        function handleChatKeyPress(event) {
-            if (event.key === 'Enter') {
-                sendMessage();
-            }
-        }
-
-        function handleSearchKeyPress(event) {
-            if (event.key === 'Enter') {
-                searchDocuments();
-            }
-        }
-
-        async function sendMessage() {
-            if (isLoading) return;
-            
-            const input = document.getElementById('chatInput');
-            const question = input.value.trim();
-            
-            if (!question) return;
-            
-            // Add user message
-            addMessage(question, 'user');
-            input.value = '';
-            
-            // Add loading message
-            const loadingId = addMessage('Thinking...', 'bot loading');
-            
-            isLoading = true;
-            
-            try {
-                const response = await fetch('/api/ask', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({question: question, max_tokens: 300})
-                });
-                
-                const data = await response.json();
-                
-                // Remove loading message
-                document.getElementById(loadingId).remove();
-                
-                if (response.ok) {
-                    let botMessage = data.answer;
-                    if (data.sources && data.sources.length > 0) {
-                        botMessage += '<div class="sources"><strong>Sources:</strong> ' + data.sources.join(', ') + '</div>';
-                    }
-                    addMessage(botMessage, 'bot');
-                } else {
-                    addMessage('Sorry, I encountered an error: ' + data.detail, 'bot error');
-                }
-            } catch (error) {
-                document.getElementById(loadingId).remove();
-                addMessage('Sorry, I encountered a network error. Please try again.', 'bot error');
-            }
-            
-            isLoading = false;
-        }
+        all_chunks.extend(chunks)
+        file_name = Path(file_path).name
+        all_metadata.extend({"source": file_path, "source_name": file_name, "chunk_id": i} for i in range(len(chunks)))
+        files_processed += 1
+    
+    # One summary line rather than one log call per failed file
+    if errors:
+        logger.warning(f"Failed to process {len(errors)} files (first: {errors[0][0]}: {errors[0][1]})")
+    
+    # Embed every file's chunks together, then persist everything in one write
+    dedup_count = await add_documents_batched(all_chunks, all_metadata)
+    total_chunks = len(all_chunks) - dedup_count
+    
+    return {"files_processed": files_processed, "chunks_added": total_chunks, "dedup_count": dedup_count,
+            "errors": len(errors)}
 
-        function addMessage(content, type) {
-            const messages = document.getElementById('messages');
-            const messageDiv = document.createElement('div');
-            const messageId = 'msg_' + Date.now();
-            messageDiv.id = messageId;
-            messageDiv.className = 'message ' + type;
-            messageDiv.innerHTML = content;
-            messages.appendChild(messageDiv);
-            messages.scrollTop = messages.scrollHeight;
-            return messageId;
-        }
+# Web interface assets, read and gzip-compressed once at import; served with ETags so browsers revalidate cheaply
+STATIC_DIR = Path(__file__).parent / "static"
+_ASSET_TYPES = {
+    "index.html": "text/html; charset=utf-8",
+    "app.css": "text/css; charset=utf-8",
+    "app.js": "text/javascript; charset=utf-8",
+}
 
-        async function searchDocuments() {
-            const input = document.getElementById('searchInput');
-            const query = input.value.trim();
-            
-            if (!query) return;
-            
-            const results = document.getElementById('searchResults');
-            results.innerHTML = '<div class="loading"></div> Searching...';
-            
-            try {
-                const response = await fetch('/api/search', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({query: query, top_k: 5})
-                });
-                
-                const data = await response.json();
-                
-                if (response.ok) {
-                    displaySearchResults(data.results);
-                } else {
-                    results.innerHTML = '<div class="message error">Search failed: ' + data.detail + '</div>';
-                }
-            } catch (error) {
-                results.innerHTML = '<div class="message error">Network error occurred during search.</div>';
-            }
-        }
+def _load_asset(name: str) -> tuple:
+    """Read a static asset as (bytes, gzip bytes, ETag, media type)"""
+    content = (STATIC_DIR / name).read_bytes()
+    return content, gzip.compress(content, compresslevel=9), f'"{hashlib.sha1(content).hexdigest()}"', _ASSET_TYPES[name]
 
-        function displaySearchResults(results) {
-            const container = document.getElementById('searchResults');
-            
-            if (results.length === 0) {
-                container.innerHTML = '<div class="message">No results found.</div>';
-                return;
-            }
-            
-            let html = '<h3>Search Results (' + results.length + ' found)</h3>';
-            
-            results.forEach((result, index) => {
-                html += `
-                    <div class="result-item">
-                        <div class="result-header">
-                            <strong>${result.source}</strong>
-                            <span class="result-score">${(result.score * 100).toFixed(1)}% match</span>
-                        </div>
-                        <div>${result.content}</div>
-                    </div>
-                `;
-            });
-            
-            container.innerHTML = html;
-        }
+_ASSETS = {name: _load_asset(name) for name in _ASSET_TYPES}
 
-        async function uploadFiles() {
-            const input = document.getElementById('fileInput');
-            const files = input.files;
-            
-            if (files.length === 0) return;
-            
-            const results = document.getElementById('uploadResults');
-            results.innerHTML = '<div class="loading"></div> Uploading and processing files...';
-            
-            const formData = new FormData();
-            for (let file of files) {
-                formData.append('files', file);
-            }
-            
-            try {
-                const response = await fetch('/api/upload', {
-                    method: 'POST',
-                    body: formData
-                });
-                
-                const data = await response.json();
-                
-                if (response.ok) {
-                    results.innerHTML = `
-                        <div class="message bot">
-                            <strong>✅ Upload Successful!</strong><br>
-                            ${data.message}<br>
-                            Files processed: ${data.files_processed}<br>
-                            Chunks added: ${data.chunks_added}
-                        </div>
-                    `;
-                    input.value = ''; // Clear the input
-                } else {
-                    results.innerHTML = '<div class="message error">Upload failed: ' + data.detail + '</div>';
-                }
-            } catch (error) {
-                results.innerHTML = '<div class="message error">Network error during upload.</div>';
-            }
-        }
+def _serve_asset(request: Request, name: str) -> Response:
+    """Serve a preloaded asset, as a 304 when the client's copy is current"""
+    content, compressed, etag, media_type = _ASSETS[name]
+    headers = {"Cache-Control": "public, max-age=3600", "ETag": etag, "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    
+    # Serve the copy compressed at import time rather than compressing per request
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=compressed, media_type=media_type, headers=headers)
+    return Response(content=content, media_type=media_type, headers=headers)
 
-        async function loadStats() {
-            const container = document.getElementById('statsGrid');
-            container.innerHTML = '<div class="stat-card"><div class="loading"></div><p>Loading...</p></div>';
-            
-            try {
-                const response = await fetch('/api/stats');
-                const data = await response.json();
-                
-                if (response.ok) {
-                    displayStats(data);
-                } else {
-                    container.innerHTML = '<div class="message error">Failed to load statistics.</div>';
-                }
-            } catch (error) {
-                container.innerHTML = '<div class="message error">Network error occurred.</div>';
-            }
-        }
+@app.get("/", response_class=HTMLResponse)
+async def get_web_interface(request: Request):
+    """Serve the main web interface"""
+    return _serve_asset(request, "index.html")
 
-        function displayStats(stats) {
-            const container = document.getElementById('statsGrid');
-            
-            let html = `
-                <div class="stat-card">
-                    <div class="stat-number">${stats.total_documents}</div>
-                    <p>Total Documents</p>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-number">${stats.total_vectors}</div>
-                    <p>Vector Embeddings</p>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-number">${stats.unique_sources}</div>
-                    <p>Unique Sources</p>
-                </div>
-                <div class="stat-card">
-                    <div class="stat-number">${stats.embedding_model.split('/').pop()}</div>
-                    <p>Embedding Model</p>
-                </div>
-            `;
-            
-            if (stats.sources && stats.sources.length > 0) {
-                html += '<div class="stat-card" style="grid-column: 1/-1;"><h4>Sources:</h4><ul>';
-                stats.sources.forEach(source => {
-                    html += '<li>' + source + '</li>';
-                });
-                html += '</ul></div>';
-            }
-            
-            container.innerHTML = html;
-        }
+@app.get("/static/{name}")
+async def get_static_asset(name: str, request: Request):
+    """Serve the interface's stylesheet and script"""
+    if name not in _ASSETS:
+        raise HTTPException(status_code=404, detail="Not found")
+    return _serve_asset(request, name)
 
-        // Load stats on page load
-        document.addEventListener('DOMContentLoaded', function() {
-            loadStats();
-        });
-    </script>
-</body>
-</html>
-    """
+def _ndjson(event: dict) -> str:
+    """Encode one event as a line of newline-delimited JSON"""
+    return json.dumps(event) + "\n"
 
 # API Endpoints
 @app.post("/api/ask")
 async def ask_question(request: QuestionRequest):
     """Ask a question using RAG"""
     try:
-        relevant_docs = vector_store.search(request.question, top_k=3)
+        question_embedding = await run_in_search_pool(vector_store.embed_query, request.question)
+        cached_response = ask_cache.lookup(question_embedding, tag=str(request.max_tokens))
+        if cached_response is not None:
+            return cached_response
+        
+        relevant_docs = await run_in_search_pool(vector_store.search_by_embedding, question_embedding, top_k=3)
         
         if not relevant_docs:
             raise HTTPException(
@@ -649,47 +264,114 @@ async def ask_question(request: QuestionRequest):
                 detail="No relevant documents found to answer your question."
             )
         
-        answer = rag_pipeline.generate_answer(
-            request.question, 
-            relevant_docs, 
-            max_tokens=request.max_tokens
-        )
-        
-        sources = list(set([
-            Path(doc.metadata.get("source", "Unknown")).name 
-            for doc, _ in relevant_docs
-        ]))
+        async with _generation_semaphore:
+            answer, from_model = await rag_pipeline.agenerate_answer_with_origin(
+                request.question, 
+                relevant_docs, 
+                max_tokens=request.max_tokens
+            )
         
-        return {
+        response = {
             "answer": answer,
-            "sources": sources,
+            "sources": sorted({source_name(doc.metadata) for doc, _ in relevant_docs}),
             "relevant_docs_count": len(relevant_docs)
         }
+        # Local fallbacks and error messages are not worth replaying
+        if from_model:
+            ask_cache.add(question_embedding, response, tag=str(request.max_tokens))
+        return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in ask_question: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """Ask a question using RAG, streaming the answer as NDJSON (sources first, then tokens)"""
+    try:
+        question_embedding = await run_in_search_pool(vector_store.embed_query, request.question)
+        cached_response = ask_cache.lookup(question_embedding, tag=str(request.max_tokens))
+        if cached_response is not None:
+            async def replay_cached():
+                yield _ndjson({"sources": cached_response["sources"], "relevant_docs_count": cached_response["relevant_docs_count"]})
+                yield _ndjson({"token": cached_response["answer"]})
+            
+            return StreamingResponse(replay_cached(), media_type="application/x-ndjson")
+        
+        relevant_docs = await run_in_search_pool(vector_store.search_by_embedding, question_embedding, top_k=3)
+        
+        if not relevant_docs:
+            raise HTTPException(
+                status_code=404, 
+                detail="No relevant documents found to answer your question."
+            )
+        
+        sources = sorted({source_name(doc.metadata) for doc, _ in relevant_docs})
+        
+        async def stream_answer():
+            yield _ndjson({"sources": sources, "relevant_docs_count": len(relevant_docs)})
+            
+            answer_parts = []
+            answer_stream = rag_pipeline.stream_answer(request.question, relevant_docs, max_tokens=request.max_tokens)
+            try:
+                async with _generation_semaphore:
+                    async for token in answer_stream:
+                        answer_parts.append(token)
+                        yield _ndjson({"token": token})
+            except Exception as e:
+                # Headers are already sent, so report the failure in-band
+                logger.error(f"Error streaming answer: {e}")
+                yield _ndjson({"error": str(e)})
+                return
+            
+            # Local fallbacks, interrupted streams and error messages are not worth replaying
+            if not answer_stream.from_model:
+                return
+            
+            ask_cache.add(question_embedding, {
+                "answer": "".join(answer_parts),
+                "sources": sources,
+                "relevant_docs_count": len(relevant_docs)
+            }, tag=str(request.max_tokens))
+        
+        return StreamingResponse(stream_answer(), media_type="application/x-ndjson")
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in ask_question_stream: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/search")
 async def search_documents(request: SearchRequest):
     """Search for relevant documents"""
     try:
-        results = vector_store.search(request.query, top_k=request.top_k)
+        query_embedding = await run_in_search_pool(vector_store.embed_query, request.query)
+        cached_response = search_cache.lookup(query_embedding, tag=str(request.top_k))
+        if cached_response is not None:
+            return cached_response
+        
+        results = await run_in_search_pool(vector_store.search_by_embedding, query_embedding, top_k=request.top_k)
         
         formatted_results = []
         for doc, score in results:
-            source = Path(doc.metadata.get("source", "Unknown")).name
+            # One 301-char slice tells both the preview and whether it was truncated
+            head = doc.page_content[:PREVIEW_CHARS + 1]
             formatted_results.append({
-                "content": doc.page_content[:300] + "..." if len(doc.page_content) > 300 else doc.page_content,
-                "source": source,
+                "content": head[:PREVIEW_CHARS] + "..." if len(head) > PREVIEW_CHARS else head,
+                "source": source_name(doc.metadata),
                 "score": float(score),
                 "metadata": doc.metadata
             })
         
-        return {
+        response = {
             "results": formatted_results,
             "total_results": len(results)
         }
+        search_cache.add(query_embedding, response, tag=str(request.top_k))
+        return response
         
     except Exception as e:
         logger.error(f"Error in search_documents: {e}")
@@ -698,8 +380,15 @@ async def search_documents(request: SearchRequest):
 @app.get("/api/stats")
 async def get_stats():
     """Get system statistics"""
+    global _stats_cache
     try:
-        stats = vector_store.get_stats()
+        now = time.monotonic()
+        if _stats_cache is not None and now - _stats_cache[0] < STATS_TTL:
+            return _stats_cache[1]
+        
+        # get_stats waits on the store lock, which ingestion holds for whole batches
+        stats = await asyncio.to_thread(vector_store.get_stats)
+        _stats_cache = (now, stats)
         return stats
     except Exception as e:
         logger.error(f"Error in get_stats: {e}")
@@ -710,34 +399,47 @@ async def upload_documents(files: List[UploadFile] = File(...)):
     """Upload and process documents"""
     try:
         files_processed = 0
-        total_chunks = 0
+        all_chunks = []
+        all_metadata = []
+        uploads = []  # (original filename, temporary path)
         
-        for file in files:
-            file_extension = Path(file.filename).suffix.lower()
-            if file_extension not in doc_processor.supported_extensions:
-                continue
+        try:
+            accepted = []
+            extensions = doc_processor.supported_extensions
+            for file in files:
+                file_extension = Path(file.filename).suffix.lower()
+                if file_extension not in extensions:
+                    continue
+                
+                with NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
+                    uploads.append((file.filename, tmp_file.name))
+                    accepted.append(file)
             
-            with NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
-                shutil.copyfileobj(file.file, tmp_file)
-                tmp_path = tmp_file.name
+            # Write the uploads to disk concurrently
+            await asyncio.gather(*(save_upload(file, tmp_path) for file, (_, tmp_path) in zip(accepted, uploads)))
             
-            try:
-                text = doc_processor.extract_text(tmp_path)
-                chunks = doc_processor.split_text(text, chunk_size=1000, chunk_overlap=200)
-                
-                metadata = [{"source": file.filename, "chunk_id": i} for i in range(len(chunks))]
-                vector_store.add_documents(chunks, metadata)
-                
+            # Extract every uploaded file concurrently
+            results = await asyncio.gather(*(extract_chunks(tmp_path) for _, tmp_path in uploads))
+            
+            for (filename, _), chunks in zip(uploads, results):
+                all_chunks.extend(chunks)
+                file_name = Path(filename).name
+                all_metadata.extend({"source": filename, "source_name": file_name, "chunk_id": i} for i in range(len(chunks)))
                 files_processed += 1
-                total_chunks += len(chunks)
                 
-            finally:
+        finally:
+            for _, tmp_path in uploads:
                 os.unlink(tmp_path)
         
+        # Embed all uploaded files' chunks together
+        dedup_count = await add_documents_batched(all_chunks, all_metadata)
+        total_chunks = len(all_chunks) - dedup_count
+        
         return {
             "message": f"Successfully processed {files_processed} files",
             "files_processed": files_processed,
-            "chunks_added": total_chunks
+            "chunks_added": total_chunks,
+            "dedup_count": dedup_count
         }
         
     except Exception as e:
@@ -749,4 +451,6 @@ if __name__ == "__main__":
     print("🚀 Starting RAG Bot Simple Web Interface...")
     print("🌐 Access the web interface at: http://localhost:8000")
     print("📚 API documentation at: http://localhost:8000/docs")
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    # uvloop and httptools are picked up automatically when installed (uvicorn[standard]);
+    # per-request access log lines are skipped, application logs stay at info
+    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info", access_log=False)
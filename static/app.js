@@ -0,0 +1,282 @@
+let isLoading = false;
+
+function showTab(tabName) {
+    // Hide all tab contents
+    document.querySelectorAll('.tab-content').forEach(content => {
+        content.classList.add('hidden');
+    });
+
+    // Remove active class from all tabs
+    document.querySelectorAll('.tab').forEach(tab => {
+        tab.classList.remove('active');
+    });
+
+    // Show selected tab content
+    document.getElementById(tabName).classList.remove('hidden');
+
+    // Add active class to clicked tab
+    event.target.classList.add('active');
+
+    // Load stats when stats tab is shown
+    if (tabName === 'stats') {
+        loadStats();
+    }
+}
+
+function handleChatKeyPress(event) {
+    if (event.key === 'Enter') {
+        sendMessage();
+    }
+}
+
+function handleSearchKeyPress(event) {
+    if (event.key === 'Enter') {
+        searchDocuments();
+    }
+}
+
+async function sendMessage() {
+    if (isLoading) return;
+
+    const input = document.getElementById('chatInput');
+    const question = input.value.trim();
+
+    if (!question) return;
+
+    // Add user message
+    addMessage(question, 'user');
+    input.value = '';
+
+    // Add loading message
+    const loadingId = addMessage('Thinking...', 'bot loading');
+
+    isLoading = true;
+
+    try {
+        const response = await fetch('/api/ask/stream', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({question: question, max_tokens: 300})
+        });
+
+        if (response.ok) {
+            await streamAnswer(response, document.getElementById(loadingId));
+        } else {
+            const data = await response.json();
+            document.getElementById(loadingId).remove();
+            addMessage('Sorry, I encountered an error: ' + data.detail, 'bot error');
+        }
+    } catch (error) {
+        document.getElementById(loadingId).remove();
+        addMessage('Sorry, I encountered a network error. Please try again.', 'bot error');
+    }
+
+    isLoading = false;
+}
+
+async function streamAnswer(response, messageDiv) {
+    // The answer arrives as NDJSON: a sources line, then one line per generated token
+    const messages = document.getElementById('messages');
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let answer = '';
+    let sources = [];
+
+    while (true) {
+        const {done, value} = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, {stream: true});
+        const lines = buffer.split('\n');
+        buffer = lines.pop();
+
+        for (const line of lines) {
+            if (!line) continue;
+            const event = JSON.parse(line);
+
+            if (event.sources) sources = event.sources;
+            if (event.error) {
+                messageDiv.className = 'message bot error';
+                messageDiv.textContent = 'Sorry, I encountered an error: ' + event.error;
+                return;
+            }
+            if (event.token) {
+                answer += event.token;
+                messageDiv.className = 'message bot';
+                messageDiv.textContent = answer;
+                messages.scrollTop = messages.scrollHeight;
+            }
+        }
+    }
+
+    let botMessage = answer;
+    if (sources.length > 0) {
+        botMessage += '<div class="sources"><strong>Sources:</strong> ' + sources.join(', ') + '</div>';
+    }
+    messageDiv.className = 'message bot';
+    messageDiv.innerHTML = botMessage;
+    messages.scrollTop = messages.scrollHeight;
+}
+
+function addMessage(content, type) {
+    const messages = document.getElementById('messages');
+    const messageDiv = document.createElement('div');
+    const messageId = 'msg_' + Date.now();
+    messageDiv.id = messageId;
+    messageDiv.className = 'message ' + type;
+    messageDiv.innerHTML = content;
+    messages.appendChild(messageDiv);
+    messages.scrollTop = messages.scrollHeight;
+    return messageId;
+}
+
+async function searchDocuments() {
+    const input = document.getElementById('searchInput');
+    const query = input.value.trim();
+
+    if (!query) return;
+
+    const results = document.getElementById('searchResults');
+    results.innerHTML = '<div class="loading"></div> Searching...';
+
+    try {
+        const response = await fetch('/api/search', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({query: query, top_k: 5})
+        });
+
+        const data = await response.json();
+
+        if (response.ok) {
+            displaySearchResults(data.results);
+        } else {
+            results.innerHTML = '<div class="message error">Search failed: ' + data.detail + '</div>';
+        }
+    } catch (error) {
+        results.innerHTML = '<div class="message error">Network error occurred during search.</div>';
+    }
+}
+
+function displaySearchResults(results) {
+    const container = document.getElementById('searchResults');
+
+    if (results.length === 0) {
+        container.innerHTML = '<div class="message">No results found.</div>';
+        return;
+    }
+
+    let html = '<h3>Search Results (' + results.length + ' found)</h3>';
+
+    results.forEach((result, index) => {
+        html += `
+            <div class="result-item">
+                <div class="result-header">
+                    <strong>${result.source}</strong>
+                    <span class="result-score">${(result.score * 100).toFixed(1)}% match</span>
+                </div>
+                <div>${result.content}</div>
+            </div>
+        `;
+    });
+
+    container.innerHTML = html;
+}
+
+async function uploadFiles() {
+    const input = document.getElementById('fileInput');
+    const files = input.files;
+
+    if (files.length === 0) return;
+
+    const results = document.getElementById('uploadResults');
+    results.innerHTML = '<div class="loading"></div> Uploading and processing files...';
+
+    const formData = new FormData();
+    for (let file of files) {
+        formData.append('files', file);
+    }
+
+    try {
+        const response = await fetch('/api/upload', {
+            method: 'POST',
+            body: formData
+        });
+
+        const data = await response.json();
+
+        if (response.ok) {
+            results.innerHTML = `
+                <div class="message bot">
+                    <strong>✅ Upload Successful!</strong><br>
+                    ${data.message}<br>
+                    Files processed: ${data.files_processed}<br>
+                    Chunks added: ${data.chunks_added}<br>
+                    Duplicate chunks skipped: ${data.dedup_count}
+                </div>
+            `;
+            input.value = ''; // Clear the input
+        } else {
+            results.innerHTML = '<div class="message error">Upload failed: ' + data.detail + '</div>';
+        }
+    } catch (error) {
+        results.innerHTML = '<div class="message error">Network error during upload.</div>';
+    }
+}
+
+async function loadStats() {
+    const container = document.getElementById('statsGrid');
+    container.innerHTML = '<div class="stat-card"><div class="loading"></div><p>Loading...</p></div>';
+
+    try {
+        const response = await fetch('/api/stats');
+        const data = await response.json();
+
+        if (response.ok) {
+            displayStats(data);
+        } else {
+            container.innerHTML = '<div class="message error">Failed to load statistics.</div>';
+        }
+    } catch (error) {
+        container.innerHTML = '<div class="message error">Network error occurred.</div>';
+    }
+}
+
+function displayStats(stats) {
+    const container = document.getElementById('statsGrid');
+
+    let html = `
+        <div class="stat-card">
+            <div class="stat-number">${stats.total_documents}</div>
+            <p>Total Documents</p>
+        </div>
+        <div class="stat-card">
+            <div class="stat-number">${stats.total_vectors}</div>
+            <p>Vector Embeddings</p>
+        </div>
+        <div class="stat-card">
+            <div class="stat-number">${stats.unique_sources}</div>
+            <p>Unique Sources</p>
+        </div>
+        <div class="stat-card">
+            <div class="stat-number">${stats.embedding_model.split('/').pop()}</div>
+            <p>Embedding Model</p>
+        </div>
+    `;
+
+    if (stats.sources && stats.sources.length > 0) {
+        html += '<div class="stat-card" style="grid-column: 1/-1;"><h4>Sources:</h4><ul>';
+        stats.sources.forEach(source => {
+            html += '<li>' + source + '</li>';
+        });
+        html += '</ul></div>';
+    }
+
+    container.innerHTML = html;
+}
+
+// Load stats on page load
+document.addEventListener('DOMContentLoaded', function() {
+    loadStats();
+});
@@ -1,265 +1,249 @@
 #!/usr/bin/env python3
 """
-Comprehensive test script for the RAG Bot system
+Comprehensive test suite for the RAG Bot system
 Tests all components and functionality
+
+Run with `pytest test_rag_system.py` (or `python test_rag_system.py`).
+The embedding model and pipeline are loaded once per session and shared by every test.
 """
 
-import asyncio
 import sys
+import asyncio
 import logging
 from pathlib import Path
 from config import Config
-import traceback
+import numpy as np
+import pytest
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent))
 
-from mcp_servers.rag_server.document_processor import DocumentProcessor
-from mcp_servers.rag_server.vector_store import VectorStore
-from mcp_servers.rag_server.rag_pipeline import RAGPipeline
+from mcp_servers.rag_server import document_processor
+from mcp_servers.rag_server.document_processor import DocumentProcessor, NUMPY_SPLIT_THRESHOLD
+from mcp_servers.rag_server.semantic_cache import SemanticCache
+from mcp_servers.rag_server.request_batcher import RequestBatcher
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class RAGSystemTester:
-    """Comprehensive tester for the RAG system"""
+TEST_FILE = Path("data/ai_basics.txt")
+DATA_DIR = Path("data")
+
+# Session fixtures: heavyweight components are built once and shared. Their modules are imported
+# here rather than at the top, so the helper tests still run where the model stack isn't installed
+
+@pytest.fixture(scope="session")
+def hf_token() -> str:
+    try:
+        token = Config.get_YOUR_HF_TOKEN_HERE()
+    except ValueError:
+        pytest.skip("Please set a valid Hugging Face token")
+    if not token or token == "your-token-here":
+        pytest.skip("Please set a valid Hugging Face token")
+    return token
+
+@pytest.fixture(scope="session")
+def processor() -> DocumentProcessor:
+    return DocumentProcessor()
+
+@pytest.fixture(scope="session")
+def session_store():
+    VectorStore = pytest.importorskip("mcp_servers.rag_server.vector_store").VectorStore
+    vector_store = VectorStore(index_path="test_vector_index")
+    yield vector_store
+    vector_store.clear()
+
+@pytest.fixture
+def vector_store(session_store):
+    """The shared store, emptied before each test"""
+    session_store.clear()
+    return session_store
+
+@pytest.fixture(scope="session")
+def pipeline(hf_token: str):
+    return pytest.importorskip("mcp_servers.rag_server.rag_pipeline").RAGPipeline(hf_token)
+
+# Document processor
+
+def test_supported_extensions(processor):
+    assert processor.supported_extensions == {'.txt', '.pdf', '.docx'}, "Supported extensions mismatch"
+
+def test_text_extraction(processor):
+    if not TEST_FILE.exists():
+        pytest.skip("Test file not found")
+    
+    text = processor.extract_text(str(TEST_FILE))
+    assert len(text) > 100, "Extracted text too short"
+    assert "Artificial Intelligence" in text, "Expected content not found"
+
+@pytest.mark.parametrize("chunk_size, chunk_overlap", [(50, 10), (200, 40)])
+def test_text_splitting(processor, chunk_size, chunk_overlap):
+    sample_text = "This is a test. " * 100  # Create long text
+    chunks = processor.split_text(sample_text, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    assert len(chunks) > 1, "Text splitting failed"
+
+@pytest.mark.parametrize("chunk_size, chunk_overlap", [(1000, 200), (50, 10)])
+def test_numpy_split_matches_regex_split(processor, monkeypatch, chunk_size, chunk_overlap):
+    # Mixed whitespace (tabs, newlines, no-break and ideographic spaces) at the edges and between words
+    words = ["alpha", "beta\u00a0gamma", "delta.\n\n", "\u00e9psilon\t", "\u3000zeta"]
+    text = " \n" + " ".join(words[i % len(words)] for i in range(NUMPY_SPLIT_THRESHOLD // 4)) + "\n "
+    assert len(text) > NUMPY_SPLIT_THRESHOLD
+    
+    numpy_chunks = processor.split_text(text, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    monkeypatch.setattr(document_processor, "NUMPY_SPLIT_THRESHOLD", len(text))
+    regex_chunks = processor.split_text(text, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    assert numpy_chunks == regex_chunks, "NumPy and regex splitting disagree"
+
+def test_document_info(processor):
+    if not TEST_FILE.exists():
+        pytest.skip("Test file not found")
+    
+    info = processor.get_document_info(str(TEST_FILE))
+    assert info["supported"], "Document should be supported"
+    assert info["name"] == "ai_basics.txt", "Wrong file name"
+
+# Vector store
+
+def test_vector_store(vector_store):
+    # Empty store stats
+    stats = vector_store.get_stats()
+    assert stats["total_documents"] == 0, "New store should be empty"
     
-    def __init__(self, YOUR_HF_TOKEN_HERE: str):
-        self.YOUR_HF_TOKEN_HERE = YOUR_HF_TOKEN_HERE
-        self.test_results = {}
-        
-    def run_all_tests(self):
-        """Run all tests sequentially"""
-        print("🚀 Starting RAG System Comprehensive Tests\n")
-        
-        tests = [
-            ("Document Processor", self.test_document_processor),
-            ("Vector Store", self.test_vector_store),
-            ("RAG Pipeline", self.test_rag_pipeline),
-            ("Integration Test", self.test_integration),
-        ]
-        
-        for test_name, test_func in tests:
-            print(f"📋 Testing {test_name}...")
-            try:
-                result = test_func()
-                self.test_results[test_name] = {"status": "PASS" if result else "FAIL", "error": None}
-                print(f"✅ {test_name}: {'PASSED' if result else 'FAILED'}\n")
-            except Exception as e:
-                self.test_results[test_name] = {"status": "ERROR", "error": str(e)}
-                print(f"❌ {test_name}: ERROR - {str(e)}\n")
-                logger.error(f"Error in {test_name}: {traceback.format_exc()}")
-        
-        self.print_summary()
+    # Add documents
+    test_texts = [
+        "Machine learning is a subset of artificial intelligence.",
+        "Deep learning uses neural networks with multiple layers.",
+        "RAG combines retrieval with generation for better answers."
+    ]
+    test_metadata = [{"source": f"test_doc_{i}.txt"} for i in range(len(test_texts))]
+    vector_store.add_documents(test_texts, test_metadata)
     
-    def test_document_processor(self) -> bool:
-        """Test document processing functionality"""
-        try:
-            processor = DocumentProcessor()
-            
-            # Test 1: Check supported extensions
-            assert processor.supported_extensions == {'.txt', '.pdf', '.docx'}, "Supported extensions mismatch"
-            print("  ✓ Supported extensions correct")
-            
-            # Test 2: Extract text from test document
-            test_file = Path("data/ai_basics.txt")
-            if test_file.exists():
-                text = processor.extract_text(str(test_file))
-                assert len(text) > 100, "Extracted text too short"
-                assert "Artificial Intelligence" in text, "Expected content not found"
-                print(f"  ✓ Text extraction successful ({len(text)} characters)")
-            else:
-                print("  ⚠ Test file not found, skipping text extraction test")
-            
-            # Test 3: Text splitting
-            sample_text = "This is a test. " * 100  # Create long text
-            chunks = processor.split_text(sample_text, chunk_size=50, chunk_overlap=10)
-            assert len(chunks) > 1, "Text splitting failed"
-            print(f"  ✓ Text splitting successful ({len(chunks)} chunks)")
-            
-            # Test 4: Document info
-            if test_file.exists():
-                info = processor.get_document_info(str(test_file))
-                assert info["supported"], "Document should be supported"
-                assert info["name"] == "ai_basics.txt", "Wrong file name"
-                print("  ✓ Document info extraction successful")
-            
-            return True
-            
-        except Exception as e:
-            print(f"  ❌ Document processor test failed: {e}")
-            return False
+    stats = vector_store.get_stats()
+    assert stats["total_documents"] == 3, f"Expected 3 documents, got {stats['total_documents']}"
     
-    def test_vector_store(self) -> bool:
-        """Test vector store functionality"""
-        try:
-            # Create vector store with temporary index
-            vector_store = VectorStore(index_path="test_vector_index")
-            
-            # Test 1: Empty store stats
-            stats = vector_store.get_stats()
-            assert stats["total_documents"] == 0, "New store should be empty"
-            print("  ✓ Empty store initialization correct")
-            
-            # Test 2: Add documents
-            test_texts = [
-                "Machine learning is a subset of artificial intelligence.",
-                "Deep learning uses neural networks with multiple layers.",
-                "RAG combines retrieval with generation for better answers."
-            ]
-            test_metadata = [{"source": f"test_doc_{i}.txt"} for i in range(len(test_texts))]
-            
-            vector_store.add_documents(test_texts, test_metadata)
-            
-            stats = vector_store.get_stats()
-            assert stats["total_documents"] == 3, f"Expected 3 documents, got {stats['total_documents']}"
-            print(f"  ✓ Document addition successful ({stats['total_documents']} documents)")
-            
-            # Test 3: Search functionality
-            results = vector_store.search("machine learning", top_k=2)
-            assert len(results) >= 1, "Search should return results"
-            assert results[0][1] > 0.5, "Top result should have good similarity score"
-            print(f"  ✓ Search functionality working ({len(results)} results)")
-            
-            # Test 4: Clear store
-            vector_store.clear()
-            stats = vector_store.get_stats()
-            assert stats["total_documents"] == 0, "Store should be empty after clear"
-            print("  ✓ Store clearing successful")
-            
-            return True
-            
-        except Exception as e:
-            print(f"  ❌ Vector store test failed: {e}")
-            return False
+    # Search functionality
+    results = vector_store.search("machine learning", top_k=2)
+    assert len(results) >= 1, "Search should return results"
+    assert results[0][1] > 0.5, "Top result should have good similarity score"
     
-    def test_rag_pipeline(self) -> bool:
-        """Test RAG pipeline functionality"""
-        try:
-            pipeline = RAGPipeline(self.YOUR_HF_TOKEN_HERE)
-            
-            # Test 1: Model connection
-            connection_test = pipeline.test_model_connection()
-            if not connection_test:
-                print("  ⚠ Model connection test failed, but continuing...")
-            else:
-                print("  ✓ Model connection successful")
-            
-            # Test 2: Answer generation with mock documents
-            from langchain.schema import Document
-            
-            mock_docs = [
-                (Document(page_content="Machine learning is a method of data analysis that automates analytical model building.", 
-                         metadata={"source": "ml_doc.txt"}), 0.9),
-                (Document(page_content="Supervised learning uses labeled training data to learn a mapping from inputs to outputs.", 
-                         metadata={"source": "supervised_doc.txt"}), 0.8)
-            ]
-            
-            question = "What is machine learning?"
-            answer = pipeline.generate_answer(question, mock_docs, max_tokens=100)
-            
-            assert len(answer) > 10, "Answer should be substantial"
-            assert not answer.startswith("Error"), "Answer should not be an error message"
-            print(f"  ✓ Answer generation successful (length: {len(answer)})")
-            
-            return True
-            
-        except Exception as e:
-            print(f"  ❌ RAG pipeline test failed: {e}")
-            return False
+    # Clear store
+    vector_store.clear()
+    stats = vector_store.get_stats()
+    assert stats["total_documents"] == 0, "Store should be empty after clear"
+
+# Caching and batching helpers (no models needed)
+
+def test_semantic_cache_threshold():
+    cache = SemanticCache(threshold=0.9)
+    cache.add(np.array([1.0, 0.0, 0.0]), "answer")
+    
+    assert cache.lookup(np.array([0.99, 0.1, 0.0])) == "answer", "Similar question should hit"
+    assert cache.lookup(np.array([0.5, 0.5, 0.0])) is None, "Dissimilar question should miss"
+    assert cache.lookup(np.array([1.0, 0.0, 0.0]), tag="64") is None, "Other tags should miss"
+
+def test_semantic_cache_eviction():
+    cache = SemanticCache(threshold=0.9, max_size=2)
+    a, b, c = np.eye(3)
+    cache.add(a, "a")
+    cache.add(b, "b")
+    cache.lookup(a)  # b is now the least recently used
+    cache.add(c, "c")
+    
+    assert len(cache) == 2
+    assert cache.lookup(b) is None, "Least recently used entry should be evicted"
+    assert cache.lookup(a) == "a" and cache.lookup(c) == "c"
+
+def test_semantic_cache_round_trip(tmp_path):
+    cache_path = str(tmp_path / "semantic_cache.npz")
+    cache = SemanticCache(cache_path=cache_path)
+    cache.add(np.array([1.0, 0.0, 0.0]), "short answer", tag="64")
+    cache.add(np.array([0.0, 1.0, 0.0]), {"answer": "not a string"})
+    cache.save()
+    
+    loaded = SemanticCache(cache_path=cache_path)
+    assert len(loaded) == 2
+    assert loaded.lookup(np.array([1.0, 0.0, 0.0]), tag="64") == "short answer"
+    assert loaded.lookup(np.array([0.0, 1.0, 0.0])) == str({"answer": "not a string"}), "Answers are stored as text"
+
+def test_request_batcher_routes_results():
+    async def handler(x):
+        await asyncio.sleep(0)
+        if x == 2:
+            raise ValueError("bad request")
+        return x * 10
+    
+    async def submit_all():
+        batcher = RequestBatcher(handler, window_ms=50)
+        return await asyncio.gather(*(batcher.submit(x) for x in range(4)), return_exceptions=True)
+    
+    results = asyncio.run(submit_all())
+    assert [results[0], results[1], results[3]] == [0, 10, 30], "Results should reach their own callers"
+    assert isinstance(results[2], ValueError), "A failure should only reach its own caller"
+
+def test_search_result():
+    SearchResult = pytest.importorskip("mcp_servers.rag_server.search_result").SearchResult
+    from langchain.schema import Document
+    
+    docs = [Document(page_content=text) for text in ("a", "b", "c")]
+    result = SearchResult.from_pairs(zip(docs, [0.9, 0.5, 0.1]))
+    
+    assert len(result) == 3
+    doc, score = result[0]
+    assert doc is docs[0] and score == pytest.approx(0.9)
+    assert [doc.page_content for doc, _ in result[1:]] == ["b", "c"], "Slicing should keep rank order"
+    assert isinstance(result[1:], SearchResult)
+    assert [doc.page_content for doc in result.filter(0.3)] == ["a", "b"]
+    assert result.max_score == pytest.approx(0.9)
+    assert SearchResult.from_pairs(result) is result
+
+# RAG pipeline
+
+def test_model_connection(pipeline):
+    # A failing connection is reported but not fatal; generation falls back to local answers
+    if not pipeline.test_model_connection():
+        logger.warning("Model connection test failed, but continuing...")
+
+def test_answer_generation(pipeline):
+    from langchain.schema import Document
+    
+    mock_docs = [
+        (Document(page_content="Machine learning is a method of data analysis that automates analytical model building.",
+                  metadata={"source": "ml_doc.txt"}), 0.9),
+        (Document(page_content="Supervised learning uses labeled training data to learn a mapping from inputs to outputs.",
+                  metadata={"source": "supervised_doc.txt"}), 0.8)
+    ]
+    
+    answer = pipeline.generate_answer("What is machine learning?", mock_docs, max_tokens=100)
+    assert len(answer) > 10, "Answer should be substantial"
+    assert not answer.startswith("Error"), "Answer should not be an error message"
+
+# Integration
+
+def test_integration(processor, vector_store, pipeline):
+    if not DATA_DIR.exists():
+        pytest.skip("Data directory not found")
     
-    def test_integration(self) -> bool:
-        """Test full integration of all components"""
-        try:
-            # Initialize all components
-            processor = DocumentProcessor()
-            vector_store = VectorStore(index_path="integration_test_index")
-            pipeline = RAGPipeline(self.YOUR_HF_TOKEN_HERE)
-            
-            # Load test documents
-            data_dir = Path("data")
-            if not data_dir.exists():
-                print("  ⚠ Data directory not found, skipping integration test")
-                return True
-            
-            loaded_docs = 0
-            for file_path in data_dir.glob("*.txt"):
-                try:
-                    # Process document
-                    text = processor.extract_text(str(file_path))
-                    chunks = processor.split_text(text, chunk_size=500, chunk_overlap=100)
-                    
-                    # Add to vector store
-                    metadata = [{"source": str(file_path)}] * len(chunks)
-                    vector_store.add_documents(chunks, metadata)
-                    loaded_docs += 1
-                    
-                except Exception as e:
-                    print(f"  ⚠ Failed to process {file_path}: {e}")
-            
-            print(f"  ✓ Loaded {loaded_docs} documents")
-            
-            # Test search and retrieval
-            test_query = "What is artificial intelligence?"
-            search_results = vector_store.search(test_query, top_k=3)
-            
-            if search_results:
-                print(f"  ✓ Search returned {len(search_results)} results")
-                
-                # Generate answer
-                answer = pipeline.generate_answer(test_query, search_results, max_tokens=200)
-                print(f"  ✓ Generated answer: {answer[:100]}...")
-                
-                # Clean up
-                vector_store.clear()
-                return True
-            else:
-                print("  ⚠ No search results found")
-                return False
-            
-        except Exception as e:
-            print(f"  ❌ Integration test failed: {e}")
-            return False
+    # Process every document, then embed all chunks in one batch
+    all_chunks = []
+    all_metadata = []
+    for file_path in DATA_DIR.glob("*.txt"):
+        text = processor.extract_text(str(file_path))
+        chunks = processor.split_text(text, chunk_size=500, chunk_overlap=100)
+        all_chunks.extend(chunks)
+        all_metadata.extend([{"source": str(file_path)}] * len(chunks))
     
-    def print_summary(self):
-        """Print test summary"""
-        print("=" * 60)
-        print("📊 TEST SUMMARY")
-        print("=" * 60)
-        
-        total_tests = len(self.test_results)
-        passed_tests = sum(1 for result in self.test_results.values() if result["status"] == "PASS")
-        failed_tests = sum(1 for result in self.test_results.values() if result["status"] == "FAIL")
-        error_tests = sum(1 for result in self.test_results.values() if result["status"] == "ERROR")
-        
-        for test_name, result in self.test_results.items():
-            status_emoji = "✅" if result["status"] == "PASS" else "❌"
-            print(f"{status_emoji} {test_name}: {result['status']}")
-            if result["error"]:
-                print(f"    Error: {result['error']}")
-        
-        print(f"\nTotal Tests: {total_tests}")
-        print(f"Passed: {passed_tests}")
-        print(f"Failed: {failed_tests}")
-        print(f"Errors: {error_tests}")
-        
-        if passed_tests == total_tests:
-            print("\n🎉 All tests passed! RAG system is ready to use.")
-        else:
-            print(f"\n⚠ {failed_tests + error_tests} test(s) failed. Please check the issues above.")
-
-def main():
-    """Main function to run all tests"""
-    # Configuration
-    HF_TOKEN = Config.get_YOUR_HF_TOKEN_HERE()
+    if all_chunks:
+        vector_store.add_documents(all_chunks, all_metadata)
+    vector_store.flush()
     
-    if not HF_TOKEN or HF_TOKEN == "your-token-here":
-        print("❌ Please set a valid Hugging Face token in the script")
-        return
+    # Test search and retrieval
+    test_query = "What is artificial intelligence?"
+    search_results = vector_store.search(test_query, top_k=3)
+    assert search_results, "No search results found"
     
-    tester = RAGSystemTester(HF_TOKEN)
-    tester.run_all_tests()
+    answer = pipeline.generate_answer(test_query, search_results, max_tokens=200)
+    assert answer, "Answer should not be empty"
 
 if __name__ == "__main__":
-    main()
+    sys.exit(pytest.main([__file__, "-v"]))
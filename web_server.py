@@ -7,7 +7,7 @@ Provides REST API endpoints for the React frontend
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional
 import os
@@ -15,14 +15,16 @@ import sys
 from pathlib import Path
 import logging
 import asyncio
-from tempfile import NamedTemporaryFile
-import shutil
+import json
+import aiofiles
+import aiofiles.tempfile
+from concurrent.futures import ThreadPoolExecutor
 from config import Config
 
 # Add project root to path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from mcp_servers.rag_server.document_processor import DocumentProcessor
+from mcp_servers.rag_server.document_processor import DocumentProcessor, extract_and_split
 from mcp_servers.rag_server.vector_store import VectorStore
 from mcp_servers.rag_server.rag_pipeline import RAGPipeline
 
@@ -60,6 +62,19 @@ class UploadResponse(BaseModel):
     files_processed: int
     chunks_added: int
 
+# Bytes read per await when streaming an upload to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Reusable copy buffers, so each upload chunk doesn't allocate (and page-fault) a fresh 1 MiB bytes object;
+# only touched from the event loop thread
+_upload_buffers: List[bytearray] = []
+
+# Lower-case file extensions the document processor can read (a class-level frozenset)
+SUPPORTED_EXTENSIONS = DocumentProcessor.supported_extensions
+
+# Snapshot of data/ saved next to the index; an unchanged directory is not re-ingested at startup
+DATA_MANIFEST_FILE = "data_manifest.json"
+
 # Initialize FastAPI app
 app = FastAPI(title="RAG Bot API", description="REST API for RAG Bot", version="1.0.0")
 
@@ -72,30 +87,120 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Files extracted at once during directory loads
+EXTRACT_WORKERS = min(4, os.cpu_count() or 1)
+
 # Global components
 HF_TOKEN = Config.get_YOUR_HF_TOKEN_HERE()
 doc_processor = None
 vector_store = None
 rag_pipeline = None
+extract_pool: Optional[ThreadPoolExecutor] = None
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize RAG components on startup"""
-    global doc_processor, vector_store, rag_pipeline
+    global doc_processor, vector_store, rag_pipeline, extract_pool
+    
+    # Document extraction threads; spawned worker processes would each re-import this module,
+    # and with it torch and the embedding stack, just to parse files
+    extract_pool = ThreadPoolExecutor(max_workers=EXTRACT_WORKERS, thread_name_prefix="extract")
     
     logger.info("Initializing RAG components...")
     doc_processor = DocumentProcessor()
-    vector_store = VectorStore(index_path="web_rag_index")
+    vector_store = VectorStore(index_path="web_rag_index",
+                               quantization=Config.VECTOR_QUANTIZATION,
+                               index_type=Config.VECTOR_INDEX_TYPE,
+                               ef_search=Config.VECTOR_EF_SEARCH,
+                               use_gpu_index=Config.VECTOR_USE_GPU,
+                               precision=Config.EMBEDDING_PRECISION,
+                               use_onnx=Config.EMBEDDING_USE_ONNX,
+                               mmap=True)
     rag_pipeline = RAGPipeline(HF_TOKEN)
     
-    # Auto-load documents from data directory
+    # Auto-load documents from data directory, unless the saved index already holds this exact snapshot
     data_dir = Path("data")
     if data_dir.exists():
-        logger.info("Auto-loading documents from data directory...")
-        await load_documents_from_directory(str(data_dir))
+        manifest = _data_manifest(data_dir)
+        manifest_file = vector_store.index_path / DATA_MANIFEST_FILE
+        if vector_store.index.ntotal > 0 and manifest_file.exists() and json.loads(manifest_file.read_text()) == manifest:
+            logger.info("Data directory unchanged since last start, using the saved index")
+        else:
+            logger.info("Auto-loading documents from data directory...")
+            result = await load_documents_from_directory(str(data_dir))
+            # Only a complete load may be skipped next time; otherwise failed files are retried
+            if result.get("errors"):
+                logger.warning(f"{result['errors']} files failed to load, they will be retried on the next start")
+            else:
+                manifest_file.write_text(json.dumps(manifest))
+    
+    # Pay model initialization (CUDA context, allocator, first kernels) and the first
+    # inference API connection now instead of on the first user request
+    try:
+        await asyncio.gather(asyncio.to_thread(vector_store.warmup),
+                             asyncio.to_thread(rag_pipeline.test_model_connection))
+    except Exception as e:
+        logger.warning(f"Warmup failed: {e}")
     
     logger.info("RAG components initialized successfully!")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the document extraction workers"""
+    if extract_pool is not None:
+        extract_pool.shutdown(wait=False, cancel_futures=True)
+
+async def _save_upload(file: UploadFile, tmp_file) -> None:
+    """Copy an upload into an open aiofiles file through a pooled buffer"""
+    # SpooledTemporaryFile only gained readinto() in Python 3.11; before that, fall back to plain reads
+    readinto = getattr(file.file, "readinto", None)
+    if readinto is None:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            await tmp_file.write(chunk)
+        return
+    
+    buffer = _upload_buffers.pop() if _upload_buffers else bytearray(UPLOAD_CHUNK_SIZE)
+    try:
+        view = memoryview(buffer)
+        while n := await asyncio.to_thread(readinto, buffer):
+            await tmp_file.write(view[:n])
+    finally:
+        _upload_buffers.append(buffer)
+
+def _data_manifest(directory: Path) -> list:
+    """Sorted [name, mtime_ns, size] of every file in a directory (one stat per entry)"""
+    with os.scandir(directory) as entries:
+        return sorted([entry.name, stat.st_mtime_ns, stat.st_size]
+                      for entry in entries if entry.is_file() for stat in (entry.stat(),))
+
+def _prefetch(file_paths: List[str]) -> None:
+    """Ask the kernel to start reading every file now, so extraction threads mostly hit the page cache"""
+    if not hasattr(os, "posix_fadvise"):  # Not available on Windows or macOS
+        return
+    for file_path in file_paths:
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logger.debug(f"Could not prefetch {file_path}: {e}")
+
+def _add_chunks(chunks: List[str], metadata: List[dict]) -> int:
+    """Embed and add chunks not already stored, then save; returns how many were added
+    
+    Boilerplate shared between files (headers, footers, tables of contents) would otherwise
+    be embedded once per copy.
+    """
+    # Dedup check and insert happen under the store's lock, so concurrent uploads cannot both add a chunk
+    added = vector_store.add_new_documents(chunks, metadata)
+    if added < len(chunks):
+        logger.info(f"Skipping {len(chunks) - added} duplicate chunks")
+    
+    vector_store.flush()
+    return added
+
 async def load_documents_from_directory(directory_path: str) -> dict:
     """Load documents from a directory"""
     directory = Path(directory_path)
@@ -104,28 +209,41 @@ async def load_documents_from_directory(directory_path: str) -> dict:
         return {"files_processed": 0, "chunks_added": 0, "error": "Directory not found"}
     
     files_processed = 0
-    total_chunks = 0
+    errors = 0
+    all_chunks = []
+    all_metadata = []
     
-    for file_path in directory.glob("*"):
-        if file_path.is_file() and file_path.suffix.lower() in doc_processor.supported_extensions:
-            try:
-                # Extract text
-                text = doc_processor.extract_text(str(file_path))
-                
-                # Split into chunks
-                chunks = doc_processor.split_text(text, chunk_size=1000, chunk_overlap=200)
-                
-                # Add to vector store
-                metadata = [{"source": str(file_path), "chunk_id": i} for i in range(len(chunks))]
-                vector_store.add_documents(chunks, metadata)
-                
-                files_processed += 1
-                total_chunks += len(chunks)
-                
-            except Exception as e:
-                logger.error(f"Error processing {file_path}: {e}")
+    # One scandir pass; DirEntry.is_file() reuses the type readdir already returned instead of a stat per entry
+    with os.scandir(directory) as entries:
+        file_paths = [entry.path for entry in entries
+                      if os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS and entry.is_file()]
+    
+    if not file_paths:
+        return {"files_processed": 0, "chunks_added": 0}
     
-    return {"files_processed": files_processed, "chunks_added": total_chunks}
+    # Queue readahead for the whole batch up front, then extract and split every file on the
+    # bounded extraction pool, overlapping file reads with parsing
+    await asyncio.to_thread(_prefetch, file_paths)
+    loop = asyncio.get_running_loop()
+    processed = await asyncio.gather(
+        *(loop.run_in_executor(extract_pool, extract_and_split, file_path, 1000, 200) for file_path in file_paths),
+        return_exceptions=True
+    )
+    
+    for file_path, chunks in zip(file_paths, processed):
+        if isinstance(chunks, Exception):
+            logger.error(f"Error processing {file_path}: {chunks}")
+            errors += 1
+            continue
+        
+        all_chunks.extend(chunks)
+        all_metadata.extend({"source": file_path, "chunk_id": i} for i in range(len(chunks)))
+        files_processed += 1
+    
+    # Embed every file's new chunks in one batch, then persist everything in one write
+    total_chunks = await asyncio.to_thread(_add_chunks, all_chunks, all_metadata)
+    
+    return {"files_processed": files_processed, "chunks_added": total_chunks, "errors": errors}
 
 # API Endpoints
 
@@ -139,7 +257,7 @@ async def ask_question(request: QuestionRequest):
     """Ask a question using RAG"""
     try:
         # Search for relevant documents
-        relevant_docs = vector_store.search(request.question, top_k=3)
+        relevant_docs = await asyncio.to_thread(vector_store.search, request.question, top_k=3)
         
         if not relevant_docs:
             raise HTTPException(
@@ -147,8 +265,8 @@ async def ask_question(request: QuestionRequest):
                 detail="No relevant documents found to answer your question."
             )
         
-        # Generate answer
-        answer = rag_pipeline.generate_answer(
+        # Generate answer (async inference client, so the event loop is never blocked)
+        answer = await rag_pipeline.agenerate_answer(
             request.question, 
             relevant_docs, 
             max_tokens=request.max_tokens
@@ -170,11 +288,57 @@ async def ask_question(request: QuestionRequest):
         logger.error(f"Error in ask_question: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse(event: str, data) -> str:
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/api/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """Ask a question using RAG, streaming the answer as Server-Sent Events
+    
+    Emits one "sources" event, then a "token" event per generated piece of text and a final "done"
+    (or "error") event.
+    """
+    try:
+        relevant_docs = await asyncio.to_thread(vector_store.search, request.question, top_k=3)
+    except Exception as e:
+        logger.error(f"Error in ask_question_stream: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not relevant_docs:
+        raise HTTPException(
+            status_code=404, 
+            detail="No relevant documents found to answer your question."
+        )
+    
+    sources = list(set([
+        Path(doc.metadata.get("source", "Unknown")).name 
+        for doc, _ in relevant_docs
+    ]))
+    
+    async def event_stream():
+        yield _sse("sources", {"sources": sources, "relevant_docs_count": len(relevant_docs)})
+        try:
+            async for token in rag_pipeline.agenerate_answer_stream(
+                request.question, 
+                relevant_docs, 
+                max_tokens=request.max_tokens
+            ):
+                yield _sse("token", token)
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Error streaming answer: {e}")
+            yield _sse("error", str(e))
+            return
+        yield _sse("done", {})
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.post("/api/search", response_model=SearchResponse)
 async def search_documents(request: SearchRequest):
     """Search for relevant documents"""
     try:
-        results = vector_store.search(request.query, top_k=request.top_k)
+        results = await asyncio.to_thread(vector_store.search, request.query, top_k=request.top_k)
         
         formatted_results = []
         for doc, score in results:
@@ -199,7 +363,8 @@ async def search_documents(request: SearchRequest):
 async def get_stats():
     """Get system statistics"""
     try:
-        stats = vector_store.get_stats()
+        # get_stats waits on the store lock, which ingestion holds for whole batches
+        stats = await asyncio.to_thread(vector_store.get_stats)
         
         return StatsResponse(
             total_documents=stats["total_documents"],
@@ -218,35 +383,38 @@ async def upload_documents(files: List[UploadFile] = File(...)):
     """Upload and process documents"""
     try:
         files_processed = 0
-        total_chunks = 0
+        all_chunks = []
+        all_metadata = []
         
         for file in files:
             # Check file extension
             file_extension = Path(file.filename).suffix.lower()
-            if file_extension not in doc_processor.supported_extensions:
+            if file_extension not in SUPPORTED_EXTENSIONS:
                 continue
             
-            # Save uploaded file temporarily
-            with NamedTemporaryFile(delete=False, suffix=file_extension) as tmp_file:
-                shutil.copyfileobj(file.file, tmp_file)
+            # Stream the upload to a temporary file without blocking the event loop
+            async with aiofiles.tempfile.NamedTemporaryFile("wb", delete=False, suffix=file_extension) as tmp_file:
                 tmp_path = tmp_file.name
+                await _save_upload(file, tmp_file)
             
             try:
                 # Process the document
-                text = doc_processor.extract_text(tmp_path)
-                chunks = doc_processor.split_text(text, chunk_size=1000, chunk_overlap=200)
+                text = await asyncio.to_thread(doc_processor.extract_text, tmp_path)
+                chunks = await asyncio.to_thread(doc_processor.split_text, text, chunk_size=1000, chunk_overlap=200)
                 
-                # Add to vector store
-                metadata = [{"source": file.filename, "chunk_id": i} for i in range(len(chunks))]
-                vector_store.add_documents(chunks, metadata)
+                # Collected here and embedded together after the loop
+                all_chunks.extend(chunks)
+                all_metadata.extend({"source": file.filename, "chunk_id": i} for i in range(len(chunks)))
                 
                 files_processed += 1
-                total_chunks += len(chunks)
                 
             finally:
                 # Clean up temporary file
                 os.unlink(tmp_path)
         
+        # One add_documents call, so every uploaded file's new chunks share one batched encoder pass
+        total_chunks = await asyncio.to_thread(_add_chunks, all_chunks, all_metadata)
+        
         return UploadResponse(
             message=f"Successfully processed {files_processed} files",
             files_processed=files_processed,
@@ -261,7 +429,7 @@ async def upload_documents(files: List[UploadFile] = File(...)):
 async def clear_documents():
     """Clear all documents from the vector store"""
     try:
-        vector_store.clear()
+        await asyncio.to_thread(vector_store.clear)
         return {"message": "All documents cleared successfully"}
     except Exception as e:
         logger.error(f"Error in clear_documents: {e}")
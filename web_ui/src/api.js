@@ -43,6 +43,46 @@ export const ragAPI = {
     return response.data;
   },
 
+  // Ask a question, receiving the answer token by token (Server-Sent Events)
+  askQuestionStream: async (question, { maxTokens = 300, onSources, onToken } = {}) => {
+    // EventSource only supports GET, so read the POST response body as a stream instead
+    const response = await fetch(`${API_BASE_URL}/api/ask/stream`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ question, max_tokens: maxTokens }),
+    });
+    if (!response.ok) {
+      throw new Error(`Request failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+
+      buffer += decoder.decode(value, { stream: true });
+      const events = buffer.split("\n\n");
+      buffer = events.pop();
+
+      for (const rawEvent of events) {
+        let event = "message";
+        let data = "";
+        for (const line of rawEvent.split("\n")) {
+          if (line.startsWith("event: ")) event = line.slice(7);
+          else if (line.startsWith("data: ")) data += line.slice(6);
+        }
+
+        const payload = JSON.parse(data);
+        if (event === "sources") onSources?.(payload);
+        else if (event === "token") onToken?.(payload);
+        else if (event === "error") throw new Error(payload);
+      }
+    }
+  },
+
   // Search documents
   searchDocuments: async (query, topK = 5) => {
     const response = await api.post("/api/search", {
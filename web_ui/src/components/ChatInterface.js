@@ -14,6 +14,7 @@ const ChatInterface = () => {
   ]);
   const [inputValue, setInputValue] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  const [streamingId, setStreamingId] = useState(null);
   const messagesEndRef = useRef(null);
 
   const scrollToBottom = () => {
@@ -38,31 +39,44 @@ const ChatInterface = () => {
     setInputValue("");
     setIsLoading(true);
 
-    try {
-      const response = await ragAPI.askQuestion(inputValue);
-
-      const botMessage = {
-        id: Date.now() + 1,
-        type: "bot",
-        content: response.answer,
-        sources: response.sources,
-        relevantDocsCount: response.relevant_docs_count,
-        timestamp: new Date(),
-      };
+    const botId = Date.now() + 1;
+    let content = "";
 
-      setMessages((prev) => [...prev, botMessage]);
+    try {
+      // Show the answer as it is generated: the message appears with its sources, then fills in
+      await ragAPI.askQuestionStream(inputValue, {
+        onSources: ({ sources, relevant_docs_count }) => {
+          const botMessage = {
+            id: botId,
+            type: "bot",
+            content: "",
+            sources,
+            relevantDocsCount: relevant_docs_count,
+            timestamp: new Date(),
+          };
+          setMessages((prev) => [...prev, botMessage]);
+          setStreamingId(botId);
+        },
+        onToken: (token) => {
+          content += token;
+          setMessages((prev) =>
+            prev.map((message) => (message.id === botId ? { ...message, content } : message))
+          );
+        },
+      });
     } catch (error) {
       const errorMessage = {
-        id: Date.now() + 1,
+        id: Date.now() + 2,
         type: "bot",
         content:
           "Sorry, I encountered an error while processing your question. Please try again.",
         error: true,
         timestamp: new Date(),
       };
-      setMessages((prev) => [...prev, errorMessage]);
+      setMessages((prev) => [...prev.filter((message) => message.id !== botId), errorMessage]);
     } finally {
       setIsLoading(false);
+      setStreamingId(null);
     }
   };
 
@@ -149,8 +163,8 @@ const ChatInterface = () => {
           </div>
         ))}
 
-        {/* Typing indicator */}
-        {isLoading && (
+        {/* Typing indicator (until the streamed answer starts) */}
+        {isLoading && !streamingId && (
           <div className="flex items-start space-x-3">
             <div className="flex-shrink-0 w-8 h-8 rounded-full bg-gray-200 text-gray-600 flex items-center justify-center">
               <Bot size={16} />